@@ -70,6 +70,16 @@ class Settings(BaseSettings):
         default="dataset_cache.json",
         description="Path to dataset cache file"
     )
+    metadata_cache_ttl: int = Field(
+        default=3600,
+        ge=0,
+        description="Time-to-live for in-memory metadata responses (seconds, 0 disables)"
+    )
+    metadata_cache_size: int = Field(
+        default=256,
+        ge=1,
+        description="Maximum number of metadata responses kept in memory"
+    )
 
     # Limits
     max_records_per_fetch: int = Field(
@@ -108,6 +118,15 @@ class Settings(BaseSettings):
         default=20,
         description="Maximum keepalive connections"
     )
+    keepalive_expiry: float = Field(
+        default=60.0,
+        description="Seconds an idle pooled connection is kept open for reuse"
+    )
+    http_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum concurrent page requests when paginating a dataset"
+    )
 
     # Retry settings
     max_retries: int = Field(
@@ -11,6 +11,7 @@ from .inputs import (
     OutputFormat,
     MetadataType,
     GetMetadataInput,
+    GetMetadataBulkInput,
 )
 
 __all__ = [
@@ -25,4 +26,5 @@ __all__ = [
     "OutputFormat",
     "MetadataType",
     "GetMetadataInput",
+    "GetMetadataBulkInput",
 ]
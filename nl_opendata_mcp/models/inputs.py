@@ -37,6 +37,12 @@ class DatasetIdInput(BaseModel):
     dataset_id: str = Field(..., min_length=1, description="Dataset ID (e.g., '85313NED')")
 
 
+class OutputFormat(str, Enum):
+    """Output format options."""
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
 class SaveDatasetInput(BaseModel):
     """Input model for saving datasets."""
     model_config = ConfigDict(str_strip_whitespace=True)
@@ -46,12 +52,8 @@ class SaveDatasetInput(BaseModel):
     skip: int = Field(default=0, ge=0, description="Records to skip (only if fetch_all=False)")
     fetch_all: bool = Field(default=False, description="If True, fetch all records using pagination")
     translate: bool = Field(default=True, description="Translate coded values to human-readable text (dimension values and column names)")
-
-
-class OutputFormat(str, Enum):
-    """Output format options."""
-    CSV = "csv"
-    PARQUET = "parquet"
+    format: OutputFormat = Field(default=OutputFormat.CSV, description="Output format: 'csv' or 'parquet' (parquet requires pyarrow)")
+    compression: str = Field(default="zstd", pattern="^(zstd|snappy|gzip|brotli|lz4|none)$", description="Parquet compression codec (ignored for csv)")
 
 
 class AnalyzeRemoteInput(BaseModel):
@@ -101,3 +103,14 @@ class GetMetadataInput(BaseModel):
     dataset_id: str = Field(..., min_length=1, description="Dataset ID (e.g., '85313NED')")
     metadata_type: MetadataType = Field(default=MetadataType.INFO, description="Type of metadata: 'info', 'structure', 'endpoints', 'dimensions', or 'custom'")
     endpoint_name: Optional[str] = Field(default=None, description="Endpoint/dimension name (required for 'dimensions' and 'custom' types, e.g., 'Geslacht', 'Perioden')")
+
+
+class GetMetadataBulkInput(BaseModel):
+    """Input model for fetching several metadata types in one call."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+    dataset_id: str = Field(..., min_length=1, description="Dataset ID (e.g., '85313NED')")
+    metadata_types: List[MetadataType] = Field(
+        default=[MetadataType.INFO, MetadataType.STRUCTURE],
+        description="Metadata types to fetch together: 'info', 'structure', and/or 'endpoints'"
+    )
+    dimensions: Optional[List[str]] = Field(default=None, description="Dimension names to fetch values for (e.g., ['Geslacht', 'Perioden'])")
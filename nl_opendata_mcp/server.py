@@ -23,6 +23,7 @@ from nl_opendata_mcp.models import (
     AnalyzeLocalInput,
     QueryDatasetInput,
     GetMetadataInput,
+    GetMetadataBulkInput,
 )
 
 # Import all tool implementations
@@ -33,6 +34,7 @@ from nl_opendata_mcp.tools.discovery import (
 )
 from nl_opendata_mcp.tools.metadata import (
     cbs_get_metadata as _cbs_get_metadata,
+    cbs_get_metadata_bulk as _cbs_get_metadata_bulk,
 )
 from nl_opendata_mcp.tools.query import (
     cbs_query_dataset as _cbs_query_dataset,
@@ -182,6 +184,30 @@ async def cbs_get_metadata(ctx: Context, params: GetMetadataInput) -> str:
     return await _cbs_get_metadata(ctx, params)
 
 
+@mcp.tool(
+    name="cbs_get_metadata_bulk",
+    annotations={"readOnlyHint": True, "destructiveHint": False, "idempotentHint": True, "openWorldHint": True}
+)
+async def cbs_get_metadata_bulk(ctx: Context, params: GetMetadataBulkInput) -> str:
+    """
+    Fetch several kinds of metadata for a dataset in one call (requests run concurrently).
+
+    Args:
+        params: GetMetadataBulkInput containing:
+            - dataset_id (str): Dataset ID (e.g., '85313NED')
+            - metadata_types (list[str]): Any of 'info', 'structure', 'endpoints' (default: ['info', 'structure'])
+            - dimensions (list[str], optional): Dimension names to fetch codes for (e.g., ['Geslacht', 'Perioden'])
+
+    Returns:
+        str: One section per requested part, formatted as in cbs_get_metadata
+
+    Examples:
+        - Explore a dataset: metadata_types=["info", "structure"]
+        - Get filter codes: metadata_types=[], dimensions=["Geslacht", "Perioden"]
+    """
+    return await _cbs_get_metadata_bulk(ctx, params)
+
+
 # ============================================================================
 # Tool Registrations - QUERY
 # ============================================================================
@@ -240,16 +266,18 @@ async def cbs_estimate_dataset_size(ctx: Context, params: DatasetIdInput) -> str
 )
 async def cbs_save_dataset(ctx: Context, params: SaveDatasetInput) -> str:
     """
-    Saves a dataset to a CSV file.
+    Saves a dataset to a CSV or Parquet file.
 
     Args:
         params: SaveDatasetInput containing:
             - dataset_id (str): Dataset ID (e.g., '85313NED')
-            - file_name (str): File name to save the dataset
+            - file_name (str): File name to save the dataset (extension set from format)
             - top (int): Records per request (default: 1000)
             - skip (int): Records to skip (default: 0)
             - fetch_all (bool): Fetch all records with pagination (default: False)
             - translate (bool): Translate coded values to text (default: True)
+            - format (str): 'csv' or 'parquet' (default: 'csv')
+            - compression (str): Parquet compression codec (default: 'zstd')
 
     Returns:
         str: Success message with file path and record count
@@ -267,10 +295,10 @@ async def cbs_save_dataset(ctx: Context, params: SaveDatasetInput) -> str:
 )
 async def cbs_list_local_datasets(ctx: Context) -> str:
     """
-    Lists all locally saved CSV datasets in the downloads directory.
+    Lists all locally saved CSV and Parquet datasets in the downloads directory.
 
     Returns:
-        str: List of CSV files with sizes and row counts.
+        str: List of CSV and Parquet files with sizes and row counts.
     """
     return await _cbs_list_local_datasets(ctx)
 
@@ -315,11 +343,11 @@ if settings.use_python_analysis:
     )
     async def cbs_analyze_local_dataset(ctx: Context, params: AnalyzeLocalInput) -> str:
         """
-        Analyzes a local CSV dataset using Python/Pandas code.
+        Analyzes a local CSV or Parquet dataset using Python/Pandas code.
 
         Args:
             params: AnalyzeLocalInput containing:
-                - dataset_name (str): Filename from downloads folder (e.g., 'population.csv')
+                - dataset_name (str): Filename from downloads folder (e.g., 'population.csv' or 'population.parquet')
                 - analysis_code (str): Python code to execute. Must use print() for output.
                 - script_path (str, optional): Path to .py file with analysis code
 
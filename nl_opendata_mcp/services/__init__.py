@@ -1,18 +1,24 @@
 """Service modules for nl-opendata-mcp server."""
-from .http_client import HTTPClientManager, fetch_with_retry, fetch_json, get_http_client
-from .cache import CatalogCache, DatasetCache, catalog_cache, dataset_cache
-from .translator import DimensionCache, DimensionTranslator, dimension_cache, translator
+from .http_client import HTTPClientManager, fetch_with_retry, fetch_many, fetch_json, get_http_client, odata_value, resource_exists
+from .cache import CatalogCache, DatasetCache, ResponseCache, catalog_cache, dataset_cache, metadata_cache
+from .translator import DimensionCache, DimensionMapping, DimensionTranslator, dimension_cache, translator
 
 __all__ = [
     "HTTPClientManager",
     "fetch_with_retry",
+    "fetch_many",
     "fetch_json",
     "get_http_client",
+    "odata_value",
+    "resource_exists",
     "CatalogCache",
     "DatasetCache",
+    "ResponseCache",
     "catalog_cache",
     "dataset_cache",
+    "metadata_cache",
     "DimensionCache",
+    "DimensionMapping",
     "DimensionTranslator",
     "dimension_cache",
     "translator",
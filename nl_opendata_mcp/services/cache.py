@@ -4,6 +4,7 @@ Cache management for nl-opendata-mcp server.
 This module provides TTL-based caching with persistence support for:
 - CBS catalog data (4,800+ datasets)
 - Downloaded dataset metadata
+- Parsed metadata responses (in memory only)
 
 Features:
     - Automatic expiration based on TTL (default: 24 hours)
@@ -14,6 +15,7 @@ Features:
 Classes:
     CatalogCache: Manages the CBS dataset catalog cache
     DatasetCache: Tracks downloaded datasets and their locations
+    ResponseCache: Memoizes parsed API responses by URL
 
 Example:
     >>> from nl_opendata_mcp.services import catalog_cache, dataset_cache
@@ -26,12 +28,15 @@ Example:
     >>> if dataset_cache.exists("/path/to/file.csv"):
     >>>     print("Using cached file")
 """
+import asyncio
 import json
 import os
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, TypeVar, Generic, Any
-from dataclasses import dataclass
+from typing import Optional, TypeVar, Generic, Any, Awaitable, Callable
+from dataclasses import dataclass, field
 
 from ..config import get_settings
 
@@ -47,6 +52,13 @@ class CacheEntry:
     data: Any
     created_at: str
     expires_at: str
+    # Timestamps parsed once, so expiry checks are a float comparison
+    _created_epoch: float = field(init=False, repr=False, compare=False)
+    _expires_epoch: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._created_epoch = datetime.fromisoformat(self.created_at).timestamp()
+        self._expires_epoch = datetime.fromisoformat(self.expires_at).timestamp()
 
     @classmethod
     def create(cls, data: Any, ttl_hours: int = 24) -> 'CacheEntry':
@@ -61,13 +73,12 @@ class CacheEntry:
     @property
     def is_expired(self) -> bool:
         """Check if this entry has expired."""
-        return datetime.now() > datetime.fromisoformat(self.expires_at)
+        return time.time() > self._expires_epoch
 
     @property
     def age_hours(self) -> float:
         """Get the age of this entry in hours."""
-        created = datetime.fromisoformat(self.created_at)
-        return (datetime.now() - created).total_seconds() / 3600
+        return (time.time() - self._created_epoch) / 3600
 
 
 class CatalogCache:
@@ -79,6 +90,7 @@ class CatalogCache:
     - Persistence to JSON file
     - Lazy loading from disk
     - Thread-safe operations
+    - Identifier -> row position map for constant-time lookups
     """
 
     def __init__(
@@ -91,6 +103,11 @@ class CatalogCache:
         self._data: list = []
         self._metadata: Optional[dict] = None
         self._loaded = False
+        self._build_index()
+
+    def _build_index(self):
+        """Map each dataset Identifier to its position in the cached records."""
+        self._positions = {item['Identifier']: i for i, item in enumerate(self._data) if 'Identifier' in item}
 
     def _load_from_disk(self) -> bool:
         """Load cache from disk if available."""
@@ -105,6 +122,7 @@ class CatalogCache:
             if isinstance(content, dict) and 'data' in content:
                 self._data = content['data']
                 self._metadata = content.get('metadata', {})
+                self._build_index()
 
                 # Check if cache is expired
                 expires_at = self._metadata.get('expires_at')
@@ -116,6 +134,7 @@ class CatalogCache:
                 # Old format - just a list, check file modification time
                 self._data = content
                 self._metadata = None
+                self._build_index()
 
                 # Check file age for old format
                 file_stat = os.stat(self.cache_file)
@@ -164,8 +183,15 @@ class CatalogCache:
         """Set cache data and persist to disk."""
         self._data = value
         self._loaded = True
+        self._build_index()
         self._save_to_disk()
 
+    def find(self, dataset_id: str) -> Optional[int]:
+        """Get the row index of a dataset identifier, or None if not cached."""
+        if not self._loaded:
+            self._load_from_disk()
+        return self._positions.get(dataset_id)
+
     @property
     def is_loaded(self) -> bool:
         """Check if cache has been loaded."""
@@ -206,6 +232,7 @@ class CatalogCache:
         self._data = []
         self._metadata = None
         self._loaded = False
+        self._build_index()
         if os.path.exists(self.cache_file):
             os.remove(self.cache_file)
             logger.info("Cache cleared")
@@ -313,6 +340,86 @@ class DatasetCache:
             logger.info("Dataset cache cleared")
 
 
+class ResponseCache:
+    """
+    In-memory LRU cache for parsed API responses with TTL expiration.
+
+    Used for metadata endpoints (TableInfos, DataProperties, dimension
+    values) that do not change within a session. Parsed JSON is stored
+    rather than formatted output, so every tool reading the same endpoint
+    shares one entry and repeat calls skip the round-trip and JSON parse.
+    """
+
+    def __init__(self, ttl_seconds: int = 3600, maxsize: int = 256):
+        self._ttl = ttl_seconds
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        timestamp, value = entry
+        if time.time() - timestamp >= self._ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        """Cache a value, evicting the least recently used entry when full."""
+        if self._ttl <= 0:
+            return
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a cached value, or fetch and cache it.
+
+        Concurrent callers for the same missing key wait for a single fetch
+        instead of each issuing their own request. Errors are not cached.
+
+        Args:
+            key: Cache key (typically the request URL)
+            fetch: Coroutine factory producing the value on a miss
+
+        Returns:
+            Cached or freshly fetched value
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                value = self.get(key)
+                if value is None:
+                    value = await fetch()
+                    self.set(key, value)
+                return value
+        finally:
+            if not lock.locked():
+                self._locks.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Clear the cache."""
+        self._entries.clear()
+        self._locks.clear()
+
+
 # Global cache instances
 catalog_cache = CatalogCache(ttl_hours=24)
 dataset_cache = DatasetCache()
+metadata_cache = ResponseCache(
+    ttl_seconds=settings.metadata_cache_ttl,
+    maxsize=settings.metadata_cache_size
+)
@@ -5,6 +5,7 @@ This module provides a shared HTTP client with:
 - Connection pooling for improved performance
 - Automatic retry with exponential backoff
 - HTTP/2 support
+- Compressed transfers (gzip, and brotli via the httpx[brotli] extra)
 - Proper lifecycle management (initialization/cleanup)
 
 The HTTPClientManager implements a singleton pattern to ensure
@@ -19,6 +20,10 @@ Example:
     >>> # Or use fetch_with_retry for automatic retries
     >>> response = await fetch_with_retry("https://api.example.com/data")
     >>>
+    >>> # Fetch a batch of pages concurrently, in order
+    >>> responses = await fetch_many(page_urls)
+    >>> rows = [odata_value(r) for r in responses]
+    >>>
     >>> # Cleanup on shutdown
     >>> await HTTPClientManager.close()
 """
@@ -30,6 +35,7 @@ from contextlib import asynccontextmanager
 import httpx
 
 from ..config import get_settings
+from ..utils import json_loads
 
 logger = logging.getLogger(__name__)
 
@@ -92,14 +98,22 @@ class HTTPClientManager:
                 # Double-check pattern
                 if cls._client is None:
                     settings = get_settings()
+                    # Accept-Encoding is left to httpx: it advertises gzip/deflate
+                    # plus br/zstd only when the matching decoder is installed.
                     cls._client = httpx.AsyncClient(
                         timeout=httpx.Timeout(
                             settings.http_timeout,
                             connect=settings.connect_timeout
                         ),
+                        # Keep enough idle connections for a full pagination window
+                        # so concurrent page requests never re-handshake.
                         limits=httpx.Limits(
-                            max_connections=settings.max_connections,
-                            max_keepalive_connections=settings.max_keepalive_connections
+                            max_connections=max(settings.max_connections, settings.http_concurrency),
+                            max_keepalive_connections=max(
+                                settings.max_keepalive_connections,
+                                settings.http_concurrency
+                            ),
+                            keepalive_expiry=settings.keepalive_expiry
                         ),
                         follow_redirects=True,
                         http2=True
@@ -175,6 +189,10 @@ async def fetch_with_retry(
 
             # Raise for other error status codes
             response.raise_for_status()
+            logger.debug(
+                "Fetched %s (%d bytes, content-encoding=%s)",
+                url, len(response.content), response.headers.get('content-encoding', 'identity')
+            )
             return response
 
         except (httpx.TimeoutException, httpx.ConnectError) as e:
@@ -195,6 +213,34 @@ async def fetch_with_retry(
     raise httpx.RequestError(f"Request failed after {max_retries} retries")
 
 
+async def fetch_many(urls: list[str], concurrency: Optional[int] = None) -> list[httpx.Response]:
+    """
+    Fetch several URLs concurrently over the shared client.
+
+    Requests are multiplexed over the pooled HTTP/2 connection, with at most
+    `concurrency` in flight at once. Each request is retried independently.
+
+    Args:
+        urls: URLs to fetch
+        concurrency: Maximum concurrent requests (default: settings.http_concurrency)
+
+    Returns:
+        Responses in the same order as `urls`
+
+    Raises:
+        httpx.HTTPStatusError: If any request fails after all retries
+        httpx.RequestError: If any request fails due to network error after all retries
+    """
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(concurrency or settings.http_concurrency)
+
+    async def fetch_one(url: str) -> httpx.Response:
+        async with semaphore:
+            return await fetch_with_retry(url)
+
+    return await asyncio.gather(*(fetch_one(url) for url in urls))
+
+
 def _calculate_backoff(
     attempt: int,
     settings: Any,
@@ -261,7 +307,7 @@ async def fetch_json(url: str, default: Any = None) -> Any:
     """
     try:
         response = await fetch_with_retry(url)
-        return response.json()
+        return json_loads(response.content)
     except Exception as e:
         logger.error(f"Failed to fetch JSON from {url}: {e}")
         if default is not None:
@@ -269,6 +315,22 @@ async def fetch_json(url: str, default: Any = None) -> Any:
         raise
 
 
+def odata_value(response: httpx.Response) -> list:
+    """
+    Decode an OData response and return its rows.
+
+    Args:
+        response: Response with a JSON body
+
+    Returns:
+        The 'value' array of an OData document, or the root if it is already a list
+    """
+    data = json_loads(response.content)
+    if isinstance(data, dict):
+        return data.get('value', [])
+    return data
+
+
 async def check_url_reachable(url: str, timeout: float = 5.0) -> bool:
     """
     Check if URL is reachable.
@@ -286,3 +348,26 @@ async def check_url_reachable(url: str, timeout: float = 5.0) -> bool:
         return response.status_code < 500
     except Exception:
         return False
+
+
+async def resource_exists(url: str) -> bool:
+    """
+    Check whether a URL resolves to an existing resource without downloading it.
+
+    Sends a HEAD request; servers that reject HEAD (405/501) are asked for
+    the first byte only with a ranged GET.
+
+    Args:
+        url: URL to check
+
+    Returns:
+        True if the server answered with a success status
+
+    Raises:
+        httpx.RequestError: If the request fails due to a network error
+    """
+    client = await HTTPClientManager.get_client()
+    response = await client.head(url)
+    if response.status_code in (405, 501):
+        response = await client.get(url, headers={"Range": "bytes=0-0"})
+    return response.is_success
@@ -22,10 +22,13 @@ Example:
 """
 import asyncio
 import logging
+import sys
 import time
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Optional
 from io import StringIO
 
+import numpy as np
 import pandas as pd
 
 from .http_client import fetch_json
@@ -35,34 +38,110 @@ logger = logging.getLogger(__name__)
 # CBS OData API base URL
 CBS_ODATA_BASE = "https://opendata.cbs.nl/ODataApi/OData"
 
+# Dimensions left untranslated by default: period codes stay filterable
+DEFAULT_SKIP_COLUMNS: frozenset[str] = frozenset({"Perioden"})
+
+
+class DimensionMapping(dict):
+    """
+    Key -> Title mapping of one dimension, keyed by stripped codes.
+
+    CBS pads codes with trailing spaces ("3000   "). Keys are stored once,
+    stripped, and lookups of a padded code fall back to its stripped form.
+    """
+
+    __slots__ = ()
+
+    def __missing__(self, key):
+        if isinstance(key, str):
+            stripped = key.strip()
+            if stripped != key:
+                return self[stripped]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or (
+            isinstance(key, str) and dict.__contains__(self, key.strip())
+        )
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
 
 class DimensionCache:
     """
     Cache for CBS dimension metadata (Key -> Title mappings).
 
-    Stores dimension value mappings with TTL-based expiration.
+    Stores dimension value mappings, and each dataset's list of dimension
+    endpoints, in an LRU with TTL-based expiration,
+    so sessions touching many datasets stay bounded in memory.
     """
 
-    def __init__(self, ttl_seconds: int = 3600):
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 512):
         """
         Initialize dimension cache.
 
         Args:
             ttl_seconds: Time-to-live for cache entries (default: 1 hour)
+            max_entries: Entries kept before the least recently used is evicted
         """
-        self._cache: dict[str, dict[str, str]] = {}
-        self._timestamps: dict[str, float] = {}
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
         self._ttl = ttl_seconds
-        self._lock = asyncio.Lock()
+        self._max_entries = max_entries
+        self._locks: dict[str, asyncio.Lock] = {}
+        # Counters are bumped in place; get_stats() returns a snapshot
+        self._stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _get(self, cache_key: str) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired."""
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        timestamp, value = entry
+        if time.time() - timestamp >= self._ttl:
+            del self._entries[cache_key]
+            return None
+        self._entries.move_to_end(cache_key)
+        return value
 
-    def _is_valid(self, cache_key: str) -> bool:
-        """Check if cache entry is valid (exists and not expired)."""
-        if cache_key not in self._cache:
-            return False
-        if cache_key not in self._timestamps:
-            return False
-        age = time.time() - self._timestamps[cache_key]
-        return age < self._ttl
+    def _set(self, cache_key: str, value: Any):
+        """Cache a value, evicting the least recently used entries when full."""
+        self._entries[cache_key] = (time.time(), value)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def _get_or_fetch(self, cache_key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Get a cached value, or fetch and cache it under cache_key."""
+        value = self._get(cache_key)
+        if value is not None:
+            self._stats["hits"] += 1
+            return value
+
+        # Lock per key: concurrent callers for the same dimension share one
+        # fetch, while different dimensions are fetched in parallel
+        lock = self._locks.setdefault(cache_key, asyncio.Lock())
+        try:
+            async with lock:
+                # Double-check after acquiring lock
+                value = self._get(cache_key)
+                if value is not None:
+                    self._stats["hits"] += 1
+                    return value
+
+                # Fetch from API
+                self._stats["misses"] += 1
+                value = await fetch()
+                self._set(cache_key, value)
+                logger.debug("Cached %d values for %s", len(value), cache_key)
+                return value
+        finally:
+            if not lock.locked():
+                self._locks.pop(cache_key, None)
 
     async def get_mapping(
         self,
@@ -77,30 +156,40 @@ class DimensionCache:
             dimension_name: Dimension name (e.g., "Geslacht", "Perioden")
 
         Returns:
-            Dictionary mapping dimension keys to titles
+            Dictionary mapping dimension keys to titles (empty if the fetch fails)
         """
-        cache_key = f"{dataset_id}:{dimension_name}"
+        # Failures are caught outside the cache, so the next call retries
+        try:
+            return await self._get_or_fetch(
+                f"{dataset_id}:{dimension_name}",
+                lambda: self._fetch_dimension(dataset_id, dimension_name)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to fetch dimension {dimension_name} for {dataset_id}: {e}")
+            return DimensionMapping()
 
-        if self._is_valid(cache_key):
-            return self._cache[cache_key]
+    async def get_dimensions(self, dataset_id: str) -> list[str]:
+        """
+        Get the dimension endpoint names of a dataset.
 
-        async with self._lock:
-            # Double-check after acquiring lock
-            if self._is_valid(cache_key):
-                return self._cache[cache_key]
+        Args:
+            dataset_id: CBS dataset identifier
 
-            # Fetch from API
-            mapping = await self._fetch_dimension(dataset_id, dimension_name)
-            self._cache[cache_key] = mapping
-            self._timestamps[cache_key] = time.time()
-            logger.debug(f"Cached {len(mapping)} values for {cache_key}")
-            return mapping
+        Returns:
+            List of dimension endpoint names (empty if the fetch fails)
+        """
+        # Bare dataset IDs cannot collide with the "dataset:dimension" keys
+        try:
+            return await self._get_or_fetch(dataset_id, lambda: self._fetch_dimension_names(dataset_id))
+        except Exception as e:
+            logger.warning(f"Failed to get available dimensions for {dataset_id}: {e}")
+            return []
 
     async def _fetch_dimension(
         self,
         dataset_id: str,
         dimension_name: str
-    ) -> dict[str, str]:
+    ) -> DimensionMapping:
         """
         Fetch dimension metadata from CBS API.
 
@@ -109,42 +198,72 @@ class DimensionCache:
             dimension_name: Dimension name
 
         Returns:
-            Dictionary mapping dimension keys to titles
+            Mapping of stripped dimension keys to titles
+
+        Raises:
+            Exception: If the request fails, so the failure is not cached
         """
         url = f"{CBS_ODATA_BASE}/{dataset_id}/{dimension_name}"
+        data = await fetch_json(url)
 
-        try:
-            data = await fetch_json(url, default={"value": []})
+        # Codes and titles recur across datasets (every RegioS table lists
+        # the same municipalities), so cached mappings share one copy of each
+        mapping = DimensionMapping()
+        for item in data.get("value", []):
+            key = item.get("Key", "")
+            title = item.get("Title", "")
+            if key and title:
+                mapping[sys.intern(key.strip())] = sys.intern(title)
 
-            mapping = {}
-            for item in data.get("value", []):
-                key = item.get("Key", "")
-                title = item.get("Title", "")
-                if key and title:
-                    # Store both stripped and original key for flexible matching
-                    mapping[key.strip()] = title
-                    if key != key.strip():
-                        mapping[key] = title
+        return mapping
 
-            return mapping
+    async def _fetch_dimension_names(self, dataset_id: str) -> list[str]:
+        """
+        Fetch the dimension endpoint names of a dataset from CBS API.
 
-        except Exception as e:
-            logger.warning(f"Failed to fetch dimension {dimension_name} for {dataset_id}: {e}")
-            return {}
+        Args:
+            dataset_id: CBS dataset identifier
+
+        Returns:
+            List of dimension endpoint names
+
+        Raises:
+            Exception: If the request fails, so the failure is not cached
+        """
+        url = f"{CBS_ODATA_BASE}/{dataset_id}"
+        data = await fetch_json(url)
+
+        # Standard non-dimension endpoints to exclude
+        standard_endpoints = {
+            "TableInfos", "UntypedDataSet", "TypedDataSet",
+            "DataProperties", "CategoryGroups"
+        }
+
+        dimensions = []
+        for item in data.get("value", []):
+            name = item.get("name", "")
+            if name and name not in standard_endpoints:
+                dimensions.append(name)
+
+        return dimensions
 
     def clear(self):
         """Clear all cached mappings."""
-        self._cache.clear()
-        self._timestamps.clear()
+        self._entries.clear()
+        self._locks.clear()
+        self._stats.update(hits=0, misses=0, evictions=0)
         logger.info("Dimension cache cleared")
 
     def get_stats(self) -> dict:
-        """Get cache statistics."""
-        valid_count = sum(1 for k in self._cache if self._is_valid(k))
+        """Get a snapshot of the cache statistics."""
+        now = time.time()
+        valid_count = sum(1 for timestamp, _ in self._entries.values() if now - timestamp < self._ttl)
         return {
-            "total_entries": len(self._cache),
+            "total_entries": len(self._entries),
             "valid_entries": valid_count,
-            "ttl_seconds": self._ttl
+            "max_entries": self._max_entries,
+            "ttl_seconds": self._ttl,
+            **self._stats
         }
 
 
@@ -235,28 +354,154 @@ class DimensionTranslator:
         Returns:
             List of dimension endpoint names
         """
-        url = f"{CBS_ODATA_BASE}/{dataset_id}"
+        return await self._cache.get_dimensions(dataset_id)
 
-        try:
-            data = await fetch_json(url, default={"value": []})
+    async def get_translatable_columns(
+        self,
+        dataset_id: str,
+        columns,
+        skip_columns: Optional[list[str]] = None
+    ) -> list[str]:
+        """
+        Select the columns whose values should be translated.
 
-            # Standard non-dimension endpoints to exclude
-            standard_endpoints = {
-                "TableInfos", "UntypedDataSet", "TypedDataSet",
-                "DataProperties", "CategoryGroups"
-            }
+        Args:
+            dataset_id: CBS dataset identifier
+            columns: Column names present in the data
+            skip_columns: Columns to leave untranslated (default: ['Perioden'] to preserve filterable codes)
 
-            dimensions = []
-            for item in data.get("value", []):
-                name = item.get("name", "")
-                if name and name not in standard_endpoints:
-                    dimensions.append(name)
+        Returns:
+            Columns that are dimensions of the dataset and not skipped
+        """
+        if skip_columns is None:
+            skip_columns = DEFAULT_SKIP_COLUMNS
 
-            return dimensions
+        # Hash lookups per column instead of scanning both lists
+        translatable = set(await self.get_available_dimensions(dataset_id)).difference(skip_columns)
+        return [col for col in columns if col in translatable]
 
-        except Exception as e:
-            logger.warning(f"Failed to get available dimensions for {dataset_id}: {e}")
-            return []
+    async def get_mappings(
+        self,
+        dataset_id: str,
+        dimension_columns: Iterable[str]
+    ) -> dict[str, dict[str, str]]:
+        """
+        Fetch Key -> Title mappings for several dimensions in parallel.
+
+        Args:
+            dataset_id: CBS dataset identifier
+            dimension_columns: Dimension columns to fetch mappings for
+
+        Returns:
+            Dictionary mapping column name to its value mapping
+            (columns whose mapping could not be fetched are omitted)
+        """
+        columns = list(dimension_columns)
+        results = await asyncio.gather(
+            *(self._cache.get_mapping(dataset_id, col) for col in columns),
+            return_exceptions=True
+        )
+
+        mappings = {}
+        for col, result in zip(columns, results):
+            if isinstance(result, dict):
+                mappings[col] = result
+            else:
+                logger.warning(f"Failed to get mapping for {col}: {result}")
+        return mappings
+
+    @staticmethod
+    def iter_translated_rows(
+        records: Iterable[dict],
+        mappings: dict[str, dict[str, str]]
+    ) -> Iterator[dict]:
+        """
+        Translate dimension values row by row, yielding each row once done.
+
+        Rows are updated in place, so each value is touched once on its way
+        to the output writer and no intermediate DataFrame is built.
+
+        Args:
+            records: Rows as decoded from the OData response
+            mappings: Column -> (Key -> Title) mappings from get_mappings()
+
+        Yields:
+            Rows with translated dimension values (unknown codes are kept)
+        """
+        # Keys are stored stripped, so one plain dict probe per value is enough
+        lookup = dict.get
+        active = [(col, mapping) for col, mapping in mappings.items() if mapping]
+        for row in records:
+            for col, mapping in active:
+                value = row.get(col)
+                if value is not None:
+                    row[col] = lookup(mapping, str(value).strip(), value)
+            yield row
+
+    @staticmethod
+    def translate_series(series: pd.Series, mapping: dict[str, str]) -> pd.Series:
+        """
+        Translate a column of dimension values.
+
+        Dimension columns hold a handful of distinct codes, so each distinct
+        value is looked up once (same rules as iter_translated_rows) and the
+        result is broadcast back with a single take, instead of a Python call
+        per cell. Unknown codes and missing values are kept.
+
+        Args:
+            series: Column with coded dimension values
+            mapping: Key -> Title mapping for the column's dimension
+
+        Returns:
+            Translated column (the input itself if nothing matched)
+        """
+        codes, uniques = pd.factorize(series)
+        uniques = uniques.tolist()
+        titles = [dict.get(mapping, str(v).strip(), v) for v in uniques]
+        if all(title is value for title, value in zip(titles, uniques)):
+            return series
+
+        # Missing values get code -1, which takes the trailing slot
+        values = np.empty(len(titles) + 1, dtype=object)
+        values[:-1] = titles
+        values[-1] = np.nan
+        translated = pd.Series(values[codes], index=series.index, name=series.name)
+        return translated.where(codes != -1, series)
+
+    async def translate_records(
+        self,
+        records: list[dict],
+        dataset_id: str,
+        dimension_columns: Optional[list[str]] = None,
+        skip_columns: Optional[list[str]] = None
+    ) -> list[dict]:
+        """
+        Translate dimension values in a list of records, in place.
+
+        Works directly on the decoded OData rows, so callers that only need
+        CSV or records never build a DataFrame.
+
+        Args:
+            records: Rows with coded dimension values
+            dataset_id: CBS dataset identifier
+            dimension_columns: Specific columns to translate (auto-detects if None)
+            skip_columns: Columns to skip translation (default: ['Perioden'] to preserve filterable codes)
+
+        Returns:
+            The same list, with translated dimension values
+        """
+        if not records:
+            return records
+
+        if dimension_columns is None:
+            dimension_columns = await self.get_translatable_columns(dataset_id, records[0].keys(), skip_columns)
+        if not dimension_columns:
+            return records
+
+        mappings = await self.get_mappings(dataset_id, dimension_columns)
+        for _ in self.iter_translated_rows(records, mappings):
+            pass
+        return records
 
     async def translate_value(
         self,
@@ -280,14 +525,7 @@ class DimensionTranslator:
 
         mapping = await self._cache.get_mapping(dataset_id, dimension_name)
 
-        # Try both stripped and original value
-        str_value = str(value)
-        if str_value.strip() in mapping:
-            return mapping[str_value.strip()]
-        if str_value in mapping:
-            return mapping[str_value]
-
-        return value
+        return dict.get(mapping, str(value).strip(), value)
 
     async def translate_dataframe(
         self,
@@ -309,50 +547,33 @@ class DimensionTranslator:
 
         Returns:
             DataFrame with translated dimension values and optionally translated column names
+            (the input itself when there is nothing to translate)
         """
         if df.empty:
             return df
 
-        # Default: skip Perioden to preserve original codes for filtering
-        if skip_columns is None:
-            skip_columns = ['Perioden']
-
         # Auto-detect dimension columns if not specified
         if dimension_columns is None:
-            available_dims = await self.get_available_dimensions(dataset_id)
-            # Only translate columns that exist in both DataFrame and available dimensions
-            # Exclude skip_columns from translation
-            dimension_columns = [
-                col for col in df.columns
-                if col in available_dims and col not in skip_columns
-            ]
+            dimension_columns = await self.get_translatable_columns(dataset_id, df.columns, skip_columns)
+        dimension_columns = [col for col in dimension_columns if col in df.columns]
+
+        # Nothing to translate: hand the frame back without copying it
+        if not dimension_columns and not translate_column_names:
+            return df
 
-        translated_df = df.copy()
+        # Shallow copy: translated columns are replaced whole below, so the
+        # untouched columns can keep sharing the caller's data
+        translated_df = df.copy(deep=False)
 
         # Translate dimension values if there are dimension columns
         if dimension_columns:
             # Fetch all dimension mappings in parallel
-            mappings = {}
-            tasks = []
-            for col in dimension_columns:
-                if col in translated_df.columns:
-                    tasks.append(self._cache.get_mapping(dataset_id, col))
-
-            if tasks:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                for col, result in zip(dimension_columns, results):
-                    if isinstance(result, dict):
-                        mappings[col] = result
-                    else:
-                        logger.warning(f"Failed to get mapping for {col}: {result}")
+            mappings = await self.get_mappings(dataset_id, dimension_columns)
 
             # Apply value translations
             for col, mapping in mappings.items():
                 if col in translated_df.columns and mapping:
-                    translated_df[col] = translated_df[col].apply(
-                        lambda x: mapping.get(str(x).strip(), mapping.get(str(x), x))
-                        if pd.notna(x) else x
-                    )
+                    translated_df[col] = self.translate_series(translated_df[col], mapping)
 
         # Translate column names to human-readable titles
         if translate_column_names:
@@ -6,6 +6,7 @@ from .discovery import (
 )
 from .metadata import (
     cbs_get_metadata,
+    cbs_get_metadata_bulk,
 )
 from .query import (
     cbs_query_dataset,
@@ -28,6 +29,7 @@ __all__ = [
     "cbs_check_dataset_availability",
     # Metadata
     "cbs_get_metadata",
+    "cbs_get_metadata_bulk",
     # Query
     "cbs_query_dataset",
     "cbs_estimate_dataset_size",
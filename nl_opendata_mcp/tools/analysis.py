@@ -1,15 +1,24 @@
 """
 Analysis tools for executing Python/Pandas code on CBS datasets.
 """
+import asyncio
 import logging
 import os
+from contextlib import redirect_stdout
+from io import StringIO
+
 import pandas as pd
 import numpy as np
 from fastmcp import Context
 
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency: pip install nl-opendata-mcp[arrow]
+    pq = None
+
 from ..config import get_settings
 from ..models import AnalyzeRemoteInput, AnalyzeLocalInput
-from ..services.http_client import fetch_with_retry
+from ..services.http_client import fetch_with_retry, odata_value
 from ..services.translator import translator
 from ..utils import (
     handle_http_error,
@@ -24,13 +33,31 @@ from ..utils import (
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+def _exec_with_output(code: str, local_env: dict) -> str:
+    """
+    Execute analysis code and return everything it printed.
+
+    This redirects the process-wide sys.stdout, so it must run on the event
+    loop: there no other coroutine can write into the capture, and runs
+    cannot interleave their redirects.
+    """
+    with redirect_stdout(StringIO()) as output:
+        exec(code, local_env)
+    return output.getvalue()
+
+
+def _read_script(path: str) -> str:
+    """Read an analysis script from disk."""
+    with open(path, 'r') as f:
+        return f.read()
+
 
 async def cbs_list_local_datasets(ctx: Context) -> str:
     """
     Lists all locally saved datasets in the downloads directory.
 
     Returns:
-        str: List of available CSV files with their sizes and modification times.
+        str: List of available CSV and Parquet files with their sizes and row counts.
 
     Use this tool BEFORE cbs_analyze_local_dataset to see what files are available.
     """
@@ -39,9 +66,24 @@ async def cbs_list_local_datasets(ctx: Context) -> str:
     if not os.path.exists(downloads_path):
         return f"Downloads directory does not exist: {downloads_path}"
 
+    # Row counting reads every file, keep it off the event loop
+    files = await asyncio.to_thread(_scan_local_datasets, downloads_path)
+
+    if not files:
+        return "No CSV or Parquet files found in downloads directory. Use cbs_save_dataset first to download data."
+
+    output = []
+    for f in sorted(files, key=lambda x: x['filename']):
+        output.append(f"{f['filename']} ({f['size_kb']} KB, ~{f['rows']} rows)")
+
+    return "\n".join(output)
+
+
+def _scan_local_datasets(downloads_path: str) -> list[dict]:
+    """Collect size and row count for every CSV and Parquet file in the downloads directory."""
     files = []
     for f in os.listdir(downloads_path):
-        if f.endswith('.csv'):
+        if f.endswith(('.csv', '.parquet')):
             full_path = os.path.join(downloads_path, f)
             stat = os.stat(full_path)
             size_kb = stat.st_size / 1024
@@ -49,17 +91,9 @@ async def cbs_list_local_datasets(ctx: Context) -> str:
                 'filename': f,
                 'full_path': os.path.abspath(full_path),
                 'size_kb': round(size_kb, 1),
-                'rows': _count_csv_rows(full_path)
+                'rows': _count_parquet_rows(full_path) if f.endswith('.parquet') else _count_csv_rows(full_path)
             })
-
-    if not files:
-        return "No CSV files found in downloads directory. Use cbs_save_dataset first to download data."
-
-    output = []
-    for f in sorted(files, key=lambda x: x['filename']):
-        output.append(f"{f['filename']} ({f['size_kb']} KB, ~{f['rows']} rows)")
-
-    return "\n".join(output)
+    return files
 
 
 def _count_csv_rows(path: str) -> str:
@@ -73,6 +107,23 @@ def _count_csv_rows(path: str) -> str:
         return "?"
 
 
+def _count_parquet_rows(path: str) -> str:
+    """Read the row count of a Parquet file from its footer."""
+    if pq is None:
+        return "?"
+    try:
+        return str(pq.ParquetFile(path).metadata.num_rows)
+    except Exception:
+        return "?"
+
+
+def _read_local_dataset(path: str) -> pd.DataFrame:
+    """Load a saved dataset, as Parquet or CSV depending on its extension."""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
 async def cbs_analyze_remote_dataset(ctx: Context, params: AnalyzeRemoteInput) -> str:
     """
     Analyzes a remote CBS dataset using Python/Pandas code. Can create charts and save to files.
@@ -163,7 +214,7 @@ async def cbs_analyze_remote_dataset(ctx: Context, params: AnalyzeRemoteInput) -
 
     try:
         response = await fetch_with_retry(url)
-        records = response.json().get('value', [])
+        records = odata_value(response)
 
         if not records:
             # Provide helpful diagnostics when no data found
@@ -200,8 +251,7 @@ async def cbs_analyze_remote_dataset(ctx: Context, params: AnalyzeRemoteInput) -
         code_to_exec = params.analysis_code
         if params.script_path:
             try:
-                with open(params.script_path, 'r') as f:
-                    code_to_exec = f.read()
+                code_to_exec = await asyncio.to_thread(_read_script, params.script_path)
             except Exception as e:
                 return f"Error reading script file: {e}"
 
@@ -217,15 +267,7 @@ async def cbs_analyze_remote_dataset(ctx: Context, params: AnalyzeRemoteInput) -
             return "\n".join(summary)
 
         try:
-            import sys
-            from io import StringIO
-            old_stdout = sys.stdout
-            redirected_output = sys.stdout = StringIO()
-
-            exec(code_to_exec, local_env)
-
-            sys.stdout = old_stdout
-            output = redirected_output.getvalue()
+            output = _exec_with_output(code_to_exec, local_env)
 
             if 'result' in local_env:
                 return str(local_env['result'])
@@ -236,7 +278,6 @@ async def cbs_analyze_remote_dataset(ctx: Context, params: AnalyzeRemoteInput) -
 
         except Exception as exec_err:
             # Enhanced error message with data context
-            sys.stdout = old_stdout
             logger.error(f"Analysis code execution error: {exec_err}")
             error_context = [
                 f"Error executing analysis code: {exec_err}",
@@ -255,7 +296,7 @@ async def cbs_analyze_remote_dataset(ctx: Context, params: AnalyzeRemoteInput) -
 
 async def cbs_analyze_local_dataset(ctx: Context, params: AnalyzeLocalInput) -> str:
     """
-    Analyzes a local CSV dataset using Python/Pandas code. Can create charts and save to files.
+    Analyzes a local CSV or Parquet dataset using Python/Pandas code. Can create charts and save to files.
 
     Args:
         params: AnalyzeLocalInput containing:
@@ -263,7 +304,7 @@ async def cbs_analyze_local_dataset(ctx: Context, params: AnalyzeLocalInput) ->
             - analysis_code (str): Python code to execute. Use print() for output.
 
     Available variables in your code:
-        - df: pandas DataFrame with the CSV data
+        - df: pandas DataFrame with the CSV or Parquet data
         - pd: pandas module
         - np: numpy module
 
@@ -316,7 +357,7 @@ async def cbs_analyze_local_dataset(ctx: Context, params: AnalyzeLocalInput) ->
         return e.to_error_string()
 
     try:
-        df = pd.read_csv(full_path)
+        df = await asyncio.to_thread(_read_local_dataset, full_path)
 
         if df.empty:
             return "No data found in dataset."
@@ -331,22 +372,16 @@ async def cbs_analyze_local_dataset(ctx: Context, params: AnalyzeLocalInput) ->
             return "Error: analysis_code not provided."
 
         try:
-            import sys
-            from io import StringIO
-            old_stdout = sys.stdout
-            redirected_output = sys.stdout = StringIO()
-
-            # Temporarily switch to downloads directory so relative paths work
+            # Temporarily switch to downloads directory so relative paths work.
+            # The working directory is process-wide, so this stays on the event
+            # loop rather than racing other handlers from a worker thread.
             cwd = os.getcwd()
             try:
                 os.chdir(settings.downloads_path)
-                exec(code_to_exec, local_env)
+                output = _exec_with_output(code_to_exec, local_env)
             finally:
                 os.chdir(cwd)
 
-            sys.stdout = old_stdout
-            output = redirected_output.getvalue()
-
             if 'result' in local_env:
                 return str(local_env['result'])
             elif output:
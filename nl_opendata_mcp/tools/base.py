@@ -2,11 +2,13 @@
 Base utilities shared across tool modules.
 """
 import logging
+from typing import Any
 from fastmcp import Context
 
 from ..config import get_settings
-from ..services.cache import catalog_cache
+from ..services.cache import catalog_cache, metadata_cache
 from ..services.http_client import fetch_with_retry
+from ..utils import json_loads
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -30,10 +32,24 @@ async def load_catalog_cache(ctx: Context):
     url = f"{settings.catalog_base_url}/Tables?$format=json&$top=10000&$select=Identifier,Title,Summary"
     try:
         response = await fetch_with_retry(url)
-        data = response.json()
+        data = json_loads(response.content)
         catalog_cache.data = data.get('value', [])
         ctx.info(f"Cached {len(catalog_cache.data)} datasets (TTL: {catalog_cache.ttl_hours}h).")
         logger.info(f"Catalog fetched and cached: {len(catalog_cache.data)} datasets")
     except Exception as e:
         ctx.error(f"Error fetching catalog: {e}")
         logger.error(f"Failed to fetch catalog: {e}")
+
+
+async def fetch_metadata_json(url: str) -> Any:
+    """
+    Fetch and parse a metadata endpoint, served from the in-memory cache when fresh.
+
+    Raises:
+        httpx.HTTPStatusError / httpx.RequestError: If the request fails (not cached)
+    """
+    async def fetch() -> Any:
+        response = await fetch_with_retry(url)
+        return json_loads(response.content)
+
+    return await metadata_cache.get_or_fetch(url, fetch)
@@ -2,20 +2,28 @@
 Discovery tools for finding and listing CBS datasets.
 """
 import logging
-import pandas as pd
+from itertools import islice
+
 from fastmcp import Context
 
 from ..config import get_settings
 from ..models import ListDatasetsInput, SearchDatasetsInput, SearchField, DatasetIdInput
 from ..services.cache import catalog_cache
-from ..services.http_client import HTTPClientManager, fetch_with_retry
-from ..utils import handle_http_error, validate_dataset_id, ValidationError
+from ..services.http_client import HTTPClientManager, fetch_with_retry, odata_value, resource_exists
+from ..utils import handle_http_error, validate_dataset_id, json_loads, records_to_csv, ValidationError
 from .base import load_catalog_cache
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+def _matches(item: dict, query_lower: str, search_field: SearchField) -> bool:
+    """Check whether a catalog record contains the lowercased query in the searched field(s)."""
+    if search_field != SearchField.SUMMARY and query_lower in (item.get('Title') or '').lower():
+        return True
+    return search_field != SearchField.TITLE and query_lower in (item.get('Summary') or '').lower()
+
+
 async def cbs_list_datasets(ctx: Context, params: ListDatasetsInput) -> str:
     """
     Lists available datasets from the CBS OData Catalog.
@@ -41,8 +49,7 @@ async def cbs_list_datasets(ctx: Context, params: ListDatasetsInput) -> str:
         data = catalog_cache.data[params.skip : params.skip + params.top]
         if not data:
             return "No datasets found."
-        df = pd.DataFrame(data)
-        return df.to_csv(index=False)
+        return records_to_csv(data)
 
     # Fallback to API if cache failed
     url = f"{settings.catalog_base_url}/Tables?$format=json&$top={params.top}&$skip={params.skip}"
@@ -50,11 +57,10 @@ async def cbs_list_datasets(ctx: Context, params: ListDatasetsInput) -> str:
     logger.info(f"Fetching datasets from API: {url}")
     try:
         response = await fetch_with_retry(url)
-        data = response.json().get('value', [])
+        data = odata_value(response)
         if not data:
             return "No datasets found."
-        df = pd.DataFrame(data)
-        return df.to_csv(index=False)
+        return records_to_csv(data)
     except Exception as e:
         return handle_http_error(e, "cbs_list_datasets")
 
@@ -85,26 +91,12 @@ async def cbs_search_datasets(ctx: Context, params: SearchDatasetsInput) -> str:
     if catalog_cache.data:
         ctx.info(f"Searching datasets in cache for '{params.query}' in {params.search_field}")
         query_lower = params.query.lower()
-        matches = []
-        for item in catalog_cache.data:
-            title = item.get('Title', '').lower()
-            summary = item.get('Summary', '').lower() if item.get('Summary') else ''
-
-            if params.search_field == SearchField.TITLE:
-                match = query_lower in title
-            elif params.search_field == SearchField.SUMMARY:
-                match = query_lower in summary
-            else:
-                match = query_lower in title or query_lower in summary
-
-            if match:
-                matches.append(item)
-
-        data = matches[params.skip : params.skip + params.top]
+        # Stop scanning once the requested page of matches is complete
+        matches = (item for item in catalog_cache.data if _matches(item, query_lower, params.search_field))
+        data = list(islice(matches, params.skip, params.skip + params.top))
         if not data:
             return "No matching datasets found."
-        df = pd.DataFrame(data)
-        return df.to_csv(index=False)
+        return records_to_csv(data)
 
     # Fallback to API
     if params.search_field == SearchField.TITLE:
@@ -118,11 +110,10 @@ async def cbs_search_datasets(ctx: Context, params: SearchDatasetsInput) -> str:
     ctx.info(f"Searching datasets with query '{params.query}': {url}")
     try:
         response = await fetch_with_retry(url)
-        data = response.json().get('value', [])
+        data = odata_value(response)
         if not data:
             return "No matching datasets found."
-        df = pd.DataFrame(data)
-        return df.to_csv(index=False)
+        return records_to_csv(data)
     except Exception as e:
         return handle_http_error(e, "cbs_search_datasets")
 
@@ -148,15 +139,12 @@ async def cbs_check_dataset_availability(ctx: Context, params: DatasetIdInput) -
     if not catalog_cache.is_loaded:
         await load_catalog_cache(ctx)
 
-    cbs_match = next((item for item in catalog_cache.data if item.get('Identifier') == dataset_id), None)
-    if cbs_match:
-        return f"Dataset '{dataset_id}' ({cbs_match.get('Title')}) is available and queryable via CBS OData."
+    idx = catalog_cache.find(dataset_id)
+    if idx is not None:
+        return f"Dataset '{dataset_id}' ({catalog_cache.data[idx].get('Title')}) is available and queryable via CBS OData."
 
     try:
-        client = await HTTPClientManager.get_client()
-        url = f"{settings.data_base_url}/{dataset_id}"
-        response = await client.get(url)
-        if response.status_code == 200:
+        if await resource_exists(f"{settings.data_base_url}/{dataset_id}"):
             return f"Dataset '{dataset_id}' is available and queryable via CBS OData (found via direct API check)."
     except:
         pass
@@ -169,7 +157,7 @@ async def cbs_check_dataset_availability(ctx: Context, params: DatasetIdInput) -
         client = await HTTPClientManager.get_client()
         response = await client.get(ckan_url)
         if response.status_code == 200:
-            data = response.json()
+            data = json_loads(response.content)
             if data.get('success'):
                 resources = data['result'].get('resources', [])
                 res_formats = [r.get('format') for r in resources]
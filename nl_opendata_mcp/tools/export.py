@@ -1,14 +1,24 @@
 """
 Export tools for saving CBS datasets to files.
 """
+import asyncio
+import csv
 import logging
-import pandas as pd
+import os
+from typing import AsyncIterator, Iterable, Optional
+
 from fastmcp import Context
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency: pip install nl-opendata-mcp[arrow]
+    pa = None
+
 from ..config import get_settings
-from ..models import SaveDatasetInput
+from ..models import SaveDatasetInput, OutputFormat
 from ..services.cache import dataset_cache
-from ..services.http_client import HTTPClientManager
+from ..services.http_client import HTTPClientManager, fetch_many, fetch_with_retry, odata_value
 from ..services.translator import translator
 from ..utils import (
     handle_http_error,
@@ -23,18 +33,262 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+class _CsvSink:
+    """Appends pages of rows to a CSV file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._started = False
+
+    def write_records(self, records: Iterable[dict], fieldnames: list[str]) -> None:
+        """Write rows directly with csv.DictWriter, without building a DataFrame."""
+        with open(self.path, 'a' if self._started else 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator='\n')
+            if not self._started:
+                writer.writeheader()
+            writer.writerows(records)
+        self._started = True
+
+    def close(self) -> None:
+        pass
+
+
+class _ParquetSink:
+    """
+    Appends pages of rows to a Parquet file through a single ParquetWriter.
+
+    The file schema is fixed when the first page is written, so column types
+    come from the dataset's DataProperties where known. Other integer and
+    all-null columns are widened to float64, since CBS measures that are
+    whole or empty in the first page can hold fractions later on.
+    """
+
+    def __init__(self, path: str, compression: str, column_types: Optional[dict] = None):
+        self.path = path
+        self.compression = compression
+        self.column_types = column_types or {}
+        self._writer = None
+
+    def _field(self, field):
+        declared = self.column_types.get(field.name)
+        if declared is not None:
+            return field.with_type(declared)
+        if pa.types.is_integer(field.type) or pa.types.is_null(field.type):
+            return field.with_type(pa.float64())
+        return field
+
+    def write_records(self, records: Iterable[dict], fieldnames: list[str]) -> None:
+        """Columnarize rows directly into Arrow, skipping pandas."""
+        table = pa.Table.from_pylist(list(records))
+        if self._writer is None:
+            schema = pa.schema([self._field(field) for field in table.schema])
+            self._writer = pq.ParquetWriter(self.path, schema, compression=self.compression)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+# File extensions written by cbs_save_dataset
+_FORMAT_EXTENSIONS = {f".{output_format.value}" for output_format in OutputFormat}
+
+
+def _with_format_extension(path: str, output_format: OutputFormat) -> str:
+    """
+    Give a save path the extension of its output format.
+
+    A .csv/.parquet extension that does not match the format is replaced,
+    and a path without one gets it appended, so the file's name always says
+    what it holds.
+    """
+    root, ext = os.path.splitext(path)
+    if ext.lower() in _FORMAT_EXTENSIONS:
+        path = root
+    return f"{path}.{output_format.value}"
+
+
+def _open_sink(path: str, output_format: OutputFormat, compression: str, column_types: Optional[dict] = None):
+    """Create the page writer for the requested output format."""
+    if output_format == OutputFormat.PARQUET:
+        return _ParquetSink(path, compression, column_types)
+    return _CsvSink(path)
+
+
+# Arrow type names for the CBS DataProperties Datatype of a topic column
+_ARROW_DATATYPES = {
+    "Double": "float64",
+    "Float": "float64",
+    "Long": "int64",
+    "Integer": "int64",
+    "Short": "int64",
+    "String": "string",
+}
+
+
+async def _fetch_column_types(dataset_id: str) -> dict:
+    """
+    Get the Arrow type of each TypedDataSet column from DataProperties.
+
+    Dimension columns hold string codes, topics carry a CBS Datatype and ID
+    is the row number. Returns {} if DataProperties is unavailable.
+    """
+    url = f"{settings.data_base_url}/{dataset_id}/DataProperties?$format=json"
+    try:
+        properties = odata_value(await fetch_with_retry(url))
+    except Exception as e:
+        logger.debug(f"Column types unavailable for {dataset_id}: {e}")
+        return {}
+
+    column_types = {"ID": pa.int64()}
+    for prop in properties:
+        key = prop.get("Key")
+        if not key:
+            continue
+        if "Dimension" in prop.get("Type", ""):
+            column_types[key] = pa.string()
+        elif prop.get("Datatype") in _ARROW_DATATYPES:
+            column_types[key] = pa.type_for_alias(_ARROW_DATATYPES[prop["Datatype"]])
+    return column_types
+
+
+async def _get_translation_mappings(dataset_id: str, records: list[dict]) -> dict[str, dict[str, str]]:
+    """Resolve the dimension value mappings for the columns of a page."""
+    columns = await translator.get_translatable_columns(dataset_id, records[0].keys())
+    return await translator.get_mappings(dataset_id, columns)
+
+
+async def _fetch_record_count(dataset_id: str) -> Optional[int]:
+    """Get the number of records in a dataset via OData $count, or None if unavailable."""
+    url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet/$count"
+    try:
+        response = await fetch_with_retry(url)
+        return int(response.text.strip())
+    except Exception as e:
+        logger.debug(f"Record count unavailable for {dataset_id}: {e}")
+        return None
+
+
+async def _iter_record_pages(ctx: Context, dataset_id: str) -> AsyncIterator[list[dict]]:
+    """
+    Yield the records of a dataset page by page, in order.
+
+    The record count is probed up front so exactly the needed pages are
+    scheduled. Pages are requested in windows of `http_concurrency`
+    concurrent requests, so at most one window of records is held in
+    memory. Pagination stops at the first empty page or at
+    `max_records_per_fetch`; without a count it runs until an empty page.
+    """
+    batch_size = settings.batch_size
+    # Only $skip varies between pages
+    page_url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet?$format=json&$top={batch_size}&$skip="
+
+    record_count = await _fetch_record_count(dataset_id)
+    limit = settings.max_records_per_fetch + 1
+    if record_count is not None:
+        ctx.info(f"Dataset {dataset_id} has {record_count:,} records")
+        limit = min(record_count, limit)
+
+    all_skips = range(0, limit, batch_size)
+    for start in range(0, len(all_skips), settings.http_concurrency):
+        skips = all_skips[start:start + settings.http_concurrency]
+        ctx.info(f"Fetching batches: skip={skips[0]}..{skips[-1]}, top={batch_size}")
+
+        responses = await fetch_many([page_url + str(skip) for skip in skips])
+        for response in responses:
+            records = odata_value(response)
+            if not records:
+                return
+            yield records
+
+    if record_count is None or record_count > settings.max_records_per_fetch:
+        ctx.warning(f"Reached maximum record limit ({settings.max_records_per_fetch:,}). Stopping pagination.")
+
+
+async def _save_all_pages(
+    ctx: Context,
+    dataset_id: str,
+    full_path: str,
+    translate: bool,
+    output_format: OutputFormat = OutputFormat.CSV,
+    compression: str = "zstd"
+) -> int:
+    """
+    Stream every page of a dataset into a CSV or Parquet file.
+
+    A producer task fetches pages into a small queue while each page is
+    translated and appended in a worker thread, so network latency overlaps
+    with translation and encoding and the event loop stays responsive.
+    Memory stays bounded by the fetch window and the queue size instead of
+    the dataset size. Data is written to a temporary file that replaces
+    `full_path` once complete.
+
+    Returns:
+        Number of records written
+    """
+    part_path = f"{full_path}.part"
+    total_records = 0
+    mappings = None
+    column_types = await _fetch_column_types(dataset_id) if output_format == OutputFormat.PARQUET else None
+    sink = _open_sink(part_path, output_format, compression, column_types)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+
+    async def produce() -> None:
+        try:
+            async for records in _iter_record_pages(ctx, dataset_id):
+                await queue.put(records)
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+
+    try:
+        while (records := await queue.get()) is not None:
+            # Apply translation if requested (values only, column names stay as valid identifiers)
+            if translate and mappings is None:
+                try:
+                    ctx.info(f"Translating dimension values for {dataset_id}...")
+                    mappings = await _get_translation_mappings(dataset_id, records)
+                except Exception as e:
+                    logger.warning(f"Translation failed for {dataset_id}: {e}")
+                    ctx.warning(f"Translation failed, saving with original codes: {e}")
+                    translate = False
+
+            rows = translator.iter_translated_rows(records, mappings) if translate else records
+            # Encode and write off the event loop so other tool calls keep running
+            await asyncio.to_thread(sink.write_records, rows, list(records[0]))
+            total_records += len(records)
+        # Re-raise any fetch error from the producer
+        await producer
+        sink.close()
+    except BaseException:
+        producer.cancel()
+        sink.close()
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+    if total_records:
+        os.replace(part_path, full_path)
+    return total_records
+
+
 async def cbs_save_dataset(ctx: Context, params: SaveDatasetInput) -> str:
     """
-    Saves a dataset to a CSV file.
+    Saves a dataset to a CSV or Parquet file.
 
     Args:
         params: SaveDatasetInput containing:
             - dataset_id (str): Dataset ID (e.g., '85313NED')
-            - file_name (str): File name to save the dataset. Default: downloads/{dataset_id}.csv
+            - file_name (str): File name to save the dataset (its extension is set from format)
             - top (int): Records per request (default: 1000, only if fetch_all=False)
             - skip (int): Records to skip (default: 0, only if fetch_all=False)
             - fetch_all (bool): Fetch all records with pagination (default: False)
             - translate (bool): Translate coded values to human-readable text (default: True)
+            - format (str): Output format, 'csv' or 'parquet' (default: 'csv')
+            - compression (str): Parquet compression codec (default: 'zstd')
 
     Returns:
         str: Success message with file path and record count, or error message
@@ -43,89 +297,68 @@ async def cbs_save_dataset(ctx: Context, params: SaveDatasetInput) -> str:
         dataset_id = validate_dataset_id(params.dataset_id)
         # Use safe path joining to prevent path traversal
         ensure_directory_exists(settings.downloads_path)
-        full_path = safe_join_path(settings.downloads_path, params.file_name)
+        full_path = _with_format_extension(
+            safe_join_path(settings.downloads_path, params.file_name), params.format
+        )
     except (ValidationError, MCPError) as e:
         return e.to_error_string()
 
+    if params.format == OutputFormat.PARQUET and pa is None:
+        return "Error: Parquet output requires pyarrow. Install it with: pip install 'nl-opendata-mcp[arrow]'"
+
     logger.info(f"Saving dataset {dataset_id} to {full_path}")
 
     try:
-        # Check cache
+        # Check cache (the path carries the format's extension, so a CSV is
+        # never served for a Parquet request)
         if dataset_cache.exists(full_path):
             ctx.info(f"Serving dataset from cache: {full_path}")
             return f"Dataset already saved to {full_path} (cached)"
 
-        client = await HTTPClientManager.get_client()
-
         if params.fetch_all:
             ctx.info(f"Fetching full dataset {dataset_id} with pagination...")
-            all_records = []
-            batch_size = settings.batch_size
-            current_skip = 0
-
-            while True:
-                url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet?$format=json&$top={batch_size}&$skip={current_skip}"
-                ctx.info(f"Fetching batch: skip={current_skip}, top={batch_size}")
-
-                response = await client.get(url)
-                response.raise_for_status()
-                records = response.json().get('value', [])
-
-                if not records:
-                    break
-
-                all_records.extend(records)
-                current_skip += batch_size
-
-                if current_skip > settings.max_records_per_fetch:
-                    ctx.warning(f"Reached maximum record limit ({settings.max_records_per_fetch:,}). Stopping pagination.")
-                    break
+            total_records = await _save_all_pages(
+                ctx, dataset_id, full_path, params.translate, params.format, params.compression
+            )
 
-            if not all_records:
+            if not total_records:
                 return "No data found in dataset."
 
-            df = pd.DataFrame(all_records)
-
-            # Apply translation if requested (values only, column names stay as valid identifiers)
-            if params.translate:
-                try:
-                    ctx.info(f"Translating dimension values for {dataset_id}...")
-                    df = await translator.translate_dataframe(df, dataset_id)
-                except Exception as e:
-                    logger.warning(f"Translation failed for {dataset_id}: {e}")
-                    ctx.warning(f"Translation failed, saving with original codes: {e}")
-
-            df.to_csv(full_path, index=False)
-
             # Update cache
-            dataset_cache.set(full_path, dataset_id, len(all_records))
+            dataset_cache.set(full_path, dataset_id, total_records)
 
             translated_msg = " (translated)" if params.translate else ""
-            logger.info(f"Dataset saved: {full_path} ({len(all_records)} records){translated_msg}")
-            return f"Full dataset saved to {full_path} ({len(all_records)} records){translated_msg}"
+            logger.info(f"Dataset saved: {full_path} ({total_records} records){translated_msg}")
+            return f"Full dataset saved to {full_path} ({total_records} records){translated_msg}"
         else:
             url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet?$format=json&$top={params.top}&$skip={params.skip}"
             ctx.info(f"Fetching data for dataset: {url}")
 
+            client = await HTTPClientManager.get_client()
             response = await client.get(url)
             response.raise_for_status()
-            records = response.json().get('value', [])
+            records = odata_value(response)
 
             if not records:
                 return "No data found in dataset."
 
-            df = pd.DataFrame(records)
-
+            rows = records
             # Apply translation if requested (values only, column names stay as valid identifiers)
             if params.translate:
                 try:
                     ctx.info(f"Translating dimension values for {dataset_id}...")
-                    df = await translator.translate_dataframe(df, dataset_id)
+                    mappings = await _get_translation_mappings(dataset_id, records)
+                    rows = translator.iter_translated_rows(records, mappings)
                 except Exception as e:
                     logger.warning(f"Translation failed for {dataset_id}: {e}")
                     ctx.warning(f"Translation failed, saving with original codes: {e}")
 
-            df.to_csv(full_path, index=False)
+            column_types = await _fetch_column_types(dataset_id) if params.format == OutputFormat.PARQUET else None
+            sink = _open_sink(full_path, params.format, params.compression, column_types)
+            try:
+                await asyncio.to_thread(sink.write_records, rows, list(records[0]))
+            finally:
+                sink.close()
 
             # Update cache
             dataset_cache.set(full_path, dataset_id, len(records))
@@ -1,19 +1,22 @@
 """
 Metadata tools for retrieving CBS dataset information and structure.
 """
-import json
+import asyncio
 import logging
-import pandas as pd
+import httpx
 from fastmcp import Context
 
 from ..config import get_settings
-from ..models import GetMetadataInput, MetadataType
-from ..services.http_client import fetch_with_retry
-from ..utils import handle_http_error, validate_dataset_id, ValidationError
+from ..models import GetMetadataInput, GetMetadataBulkInput, MetadataType
+from ..utils import handle_http_error, validate_dataset_id, json_dumps, records_to_csv, ValidationError
+from .base import fetch_metadata_json
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Resolved once at import; URLs are built on every tool call
+DATA_BASE_URL = settings.data_base_url
+
 
 async def cbs_get_metadata(ctx: Context, params: GetMetadataInput) -> str:
     """
@@ -58,16 +61,16 @@ async def cbs_get_metadata(ctx: Context, params: GetMetadataInput) -> str:
 
     # Build URL and determine output format based on metadata type
     if params.metadata_type == MetadataType.INFO:
-        url = f"{settings.data_base_url}/{dataset_id}/TableInfos?$format=json"
+        url = f"{DATA_BASE_URL}/{dataset_id}/TableInfos?$format=json"
         return await _fetch_csv_metadata(ctx, url, "info")
 
     elif params.metadata_type == MetadataType.STRUCTURE:
-        url = f"{settings.data_base_url}/{dataset_id}/DataProperties?$format=json"
+        url = f"{DATA_BASE_URL}/{dataset_id}/DataProperties?$format=json"
         return await _fetch_csv_metadata(ctx, url, "structure")
 
     elif params.metadata_type == MetadataType.ENDPOINTS:
         # $format=json is required: the ODataFeed root returns Atom XML by default.
-        url = f"{settings.data_base_url}/{dataset_id}?$format=json"
+        url = f"{DATA_BASE_URL}/{dataset_id}?$format=json"
         return await _fetch_json_metadata(ctx, url)
 
     elif params.metadata_type == MetadataType.DIMENSIONS:
@@ -79,24 +82,65 @@ async def cbs_get_metadata(ctx: Context, params: GetMetadataInput) -> str:
         if not params.endpoint_name:
             return "Error: endpoint_name is required when metadata_type='custom'"
         # $format=json is required: ODataFeed endpoints return Atom XML by default.
-        url = f"{settings.data_base_url}/{dataset_id}/{params.endpoint_name}?$format=json"
+        url = f"{DATA_BASE_URL}/{dataset_id}/{params.endpoint_name}?$format=json"
         return await _fetch_json_metadata(ctx, url)
 
     else:
         return f"Error: Unknown metadata type: {params.metadata_type}"
 
 
+async def cbs_get_metadata_bulk(ctx: Context, params: GetMetadataBulkInput) -> str:
+    """
+    Fetch several metadata types and dimension tables for a dataset concurrently.
+
+    Each part is produced exactly as by cbs_get_metadata, but all requests are
+    issued at once over the shared client, so latency is that of the slowest
+    request instead of the sum of all of them.
+
+    Args:
+        params: GetMetadataBulkInput containing:
+            - dataset_id (str): Dataset ID (e.g., '85313NED')
+            - metadata_types (list[str]): Any of 'info', 'structure', 'endpoints' (default: info, structure)
+            - dimensions (list[str], optional): Dimension names to fetch values for
+
+    Returns:
+        str: One section per requested part, in request order
+    """
+    try:
+        dataset_id = validate_dataset_id(params.dataset_id)
+    except ValidationError as e:
+        return e.to_error_string()
+
+    unsupported = [t.value for t in params.metadata_types if t in (MetadataType.DIMENSIONS, MetadataType.CUSTOM)]
+    if unsupported:
+        return f"Error: metadata_types {unsupported} are not supported here. Use dimensions=[...] for dimension values, or cbs_get_metadata for custom endpoints."
+
+    requests = [
+        (t.value.upper(), GetMetadataInput(dataset_id=dataset_id, metadata_type=t))
+        for t in dict.fromkeys(params.metadata_types)
+    ]
+    requests += [
+        (f"DIMENSION {name}", GetMetadataInput(dataset_id=dataset_id, metadata_type=MetadataType.DIMENSIONS, endpoint_name=name))
+        for name in dict.fromkeys(params.dimensions or [])
+    ]
+    if not requests:
+        return "Error: Specify at least one metadata type or dimension."
+
+    logger.info(f"Getting bulk metadata: dataset={dataset_id}, parts={[label for label, _ in requests]}")
+    results = await asyncio.gather(*(cbs_get_metadata(ctx, request) for _, request in requests))
+
+    return "\n\n".join(f"=== {label} ===\n{result}" for (label, _), result in zip(requests, results))
+
+
 async def _fetch_csv_metadata(ctx: Context, url: str, metadata_type: str) -> str:
     """Fetch metadata and return as CSV."""
     ctx.info(f"Fetching {metadata_type} metadata from: {url}")
     try:
-        response = await fetch_with_retry(url)
-        data = response.json()
+        data = await fetch_metadata_json(url)
         records = data.get('value', [])
         if not records:
             return f"No {metadata_type} metadata found."
-        df = pd.DataFrame(records)
-        return df.to_csv(index=False)
+        return records_to_csv(records)
     except Exception as e:
         return handle_http_error(e, "cbs_get_metadata")
 
@@ -105,26 +149,47 @@ async def _fetch_json_metadata(ctx: Context, url: str) -> str:
     """Fetch metadata and return as JSON."""
     ctx.info(f"Fetching metadata from: {url}")
     try:
-        response = await fetch_with_retry(url)
-        data = response.json()
-        return json.dumps(data, indent=2)
+        data = await fetch_metadata_json(url)
+        return json_dumps(data)
     except Exception as e:
         return handle_http_error(e, "cbs_get_metadata")
 
 
+def _format_dimension_table(records: list[dict]) -> str:
+    """
+    Format dimension records as a left-aligned Code/Title/Description table.
+
+    Column widths are computed up front and each row is written with a
+    single f-string, avoiding DataFrame construction and pandas formatting
+    for large dimensions such as RegioS.
+    """
+    rows = [
+        (str(r.get('Key', r.get('Identifier', ''))), str(r.get('Title') or ''), (r.get('Description') or '')[:80])
+        for r in records
+    ]
+    w_code = max(len('Code'), *(len(code) for code, _, _ in rows))
+    w_title = max(len('Title'), *(len(title) for _, title, _ in rows))
+
+    lines = [f"{'Code':<{w_code}}  {'Title':<{w_title}}  Description"]
+    lines.extend(
+        f"{code:<{w_code}}  {title:<{w_title}}  {description}".rstrip()
+        for code, title, description in rows
+    )
+    return "\n".join(lines)
+
+
 async def _fetch_dimension_values(ctx: Context, dataset_id: str, dimension_name: str) -> str:
     """
     Fetch dimension values with codes for OData filtering.
     Returns a formatted table with Code, Title, Description.
     """
     dimension_name = dimension_name.strip()
-    url = f"{settings.data_base_url}/{dataset_id}/{dimension_name}?$format=json"
+    url = f"{DATA_BASE_URL}/{dataset_id}/{dimension_name}?$format=json"
     ctx.info(f"Getting dimension values for {dataset_id}/{dimension_name}")
     logger.info(f"Getting dimension values: {dataset_id}/{dimension_name}")
 
     try:
-        response = await fetch_with_retry(url)
-        data = response.json()
+        data = await fetch_metadata_json(url)
 
         # Handle both direct array and 'value' wrapper
         if isinstance(data, dict):
@@ -135,28 +200,18 @@ async def _fetch_dimension_values(ctx: Context, dataset_id: str, dimension_name:
         if not records:
             return f"No values found for dimension '{dimension_name}'.\n\nTIP: Use metadata_type='structure' to see available dimensions (look for Type='Dimension')."
 
-        # Extract relevant columns
-        output_records = []
-        for r in records:
-            output_records.append({
-                'Code': r.get('Key', r.get('Identifier', '')),
-                'Title': r.get('Title', ''),
-                'Description': (r.get('Description', '') or '')[:80]
-            })
-
-        df = pd.DataFrame(output_records)
-
         # Compact format output
         header = [
-            f"DIMENSION: {dimension_name} ({len(df)} values)",
+            f"DIMENSION: {dimension_name} ({len(records)} values)",
             f"Use Code in filter: {dimension_name} eq '<Code>'",
             "-" * 50,
         ]
 
-        return "\n".join(header) + "\n" + df.to_string(index=False)
+        return "\n".join(header) + "\n" + _format_dimension_table(records)
 
-    except Exception as e:
-        error_msg = str(e)
-        if "404" in error_msg or "Not Found" in error_msg:
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
             return f"Dimension '{dimension_name}' not found.\n\nTIP: Use metadata_type='structure' to see available dimensions."
         return handle_http_error(e, "cbs_get_metadata")
+    except Exception as e:
+        return handle_http_error(e, "cbs_get_metadata")
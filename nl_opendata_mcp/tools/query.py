@@ -1,27 +1,36 @@
 """
 Query tools for fetching and inspecting CBS dataset data.
 """
+import asyncio
 import logging
-import pandas as pd
+import httpx
 from fastmcp import Context
 
 from ..config import get_settings
 from ..models import DatasetIdInput, QueryDatasetInput
 from ..services.cache import catalog_cache
-from ..services.http_client import HTTPClientManager, fetch_with_retry
+from ..services.http_client import HTTPClientManager, fetch_with_retry, odata_value, resource_exists
 from ..services.translator import translator
 from ..utils import (
     handle_http_error,
     validate_dataset_id,
     sanitize_odata_filter,
     sanitize_select_columns,
+    json_loads,
+    records_to_csv,
     ValidationError,
 )
-from .base import load_catalog_cache
+from .base import load_catalog_cache, fetch_metadata_json
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Resolved once at import; URLs are built on every tool call
+DATA_BASE_URL = settings.data_base_url
+_SIZE_SAMPLE_URL = DATA_BASE_URL + "/%s/TypedDataSet?$format=json&$top=1"
+# Bracketing probes only test for a row, so they select the ID key column alone
+_SIZE_PROBE_URL = DATA_BASE_URL + "/%s/TypedDataSet?$format=json&$top=1&$select=ID&$skip=%d"
+
 
 async def cbs_estimate_dataset_size(ctx: Context, params: DatasetIdInput) -> str:
     """
@@ -50,11 +59,19 @@ async def cbs_estimate_dataset_size(ctx: Context, params: DatasetIdInput) -> str
     try:
         client = await HTTPClientManager.get_client()
 
-        # Get sample for column info
-        sample_url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet?$format=json&$top=1"
-        sample_resp = await client.get(sample_url)
+        # Sample for column info plus bracketing probes, all in flight at once
+        probe_skips = (0, 1000, 10000, 100000)
+        responses = await asyncio.gather(
+            client.get(_SIZE_SAMPLE_URL % dataset_id),
+            *(client.get(_SIZE_PROBE_URL % (dataset_id, skip)) for skip in probe_skips[1:]),
+            return_exceptions=True
+        )
+
+        sample_resp = responses[0]
+        if isinstance(sample_resp, BaseException):
+            raise sample_resp
         sample_resp.raise_for_status()
-        sample_data = sample_resp.json().get('value', [])
+        sample_data = odata_value(sample_resp)
 
         if sample_data:
             columns = list(sample_data[0].keys())
@@ -65,33 +82,24 @@ async def cbs_estimate_dataset_size(ctx: Context, params: DatasetIdInput) -> str
             output.append("No data available in dataset.")
             return "\n".join(output)
 
-        # Estimate rows
-        test_url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet?$format=json&$top=1&$skip=100000"
-        test_resp = await client.get(test_url)
-        test_data = test_resp.json().get('value', [])
+        # Estimate rows from the largest skip that still returned a row
+        has_rows = {
+            skip: isinstance(resp, httpx.Response) and resp.is_success and bool(odata_value(resp))
+            for skip, resp in zip(probe_skips[1:], responses[1:])
+        }
 
-        if test_data:
+        if has_rows[100000]:
             row_estimate = ">100,000 rows"
             strategy = "LARGE: Use cbs_save_dataset(fetch_all=True) with select parameter"
+        elif has_rows[10000]:
+            row_estimate = "10,000 - 100,000 rows"
+            strategy = "MEDIUM: Consider using select parameter to reduce columns"
+        elif has_rows[1000]:
+            row_estimate = "1,000 - 10,000 rows"
+            strategy = "MEDIUM: Safe to query with compact=True"
         else:
-            test_url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet?$format=json&$top=1&$skip=10000"
-            test_resp = await client.get(test_url)
-            test_data = test_resp.json().get('value', [])
-
-            if test_data:
-                row_estimate = "10,000 - 100,000 rows"
-                strategy = "MEDIUM: Consider using select parameter to reduce columns"
-            else:
-                test_url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet?$format=json&$top=1&$skip=1000"
-                test_resp = await client.get(test_url)
-                test_data = test_resp.json().get('value', [])
-
-                if test_data:
-                    row_estimate = "1,000 - 10,000 rows"
-                    strategy = "MEDIUM: Safe to query with compact=True"
-                else:
-                    row_estimate = "<1,000 rows"
-                    strategy = "SMALL: Safe to return full CSV directly"
+            row_estimate = "<1,000 rows"
+            strategy = "SMALL: Safe to return full CSV directly"
 
         output.append(f"Estimated rows: {row_estimate}")
         output.append("-" * 40)
@@ -106,6 +114,19 @@ async def cbs_estimate_dataset_size(ctx: Context, params: DatasetIdInput) -> str
         return handle_http_error(e, "cbs_estimate_dataset_size")
 
 
+def _compact_query_result(dataset_id: str, row_count: int, columns: list[str], sample_csv: str) -> str:
+    """Summarize a large query result: shape, column names and a 5-row sample."""
+    summary = [
+        f"QUERY RESULT: {dataset_id}",
+        f"Rows: {row_count}, Columns: {len(columns)}",
+        f"Columns: {', '.join(columns)}",
+        "---",
+        "SAMPLE (first 5 rows):",
+        sample_csv
+    ]
+    return "\n".join(summary)
+
+
 async def cbs_query_dataset(ctx: Context, params: QueryDatasetInput) -> str:
     """
     Queries data from a dataset with optional filtering and column selection.
@@ -133,7 +154,7 @@ async def cbs_query_dataset(ctx: Context, params: QueryDatasetInput) -> str:
     except ValidationError as e:
         return e.to_error_string()
 
-    url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet?$format=json&$top={params.top}&$skip={params.skip}"
+    url = f"{DATA_BASE_URL}/{dataset_id}/TypedDataSet?$format=json&$top={params.top}&$skip={params.skip}"
     if sanitized_filter:
         url += f"&$filter={sanitized_filter}"
     if sanitized_select:
@@ -144,34 +165,25 @@ async def cbs_query_dataset(ctx: Context, params: QueryDatasetInput) -> str:
 
     try:
         response = await fetch_with_retry(url)
-        data = response.json().get('value', [])
+        data = odata_value(response)
 
         if not data:
             return "No records found."
 
-        df = pd.DataFrame(data)
-
         # Auto-translate coded dimension values to human-readable text
         if params.translate:
             try:
                 ctx.info(f"Translating dimension values for {dataset_id}...")
-                df = await translator.translate_dataframe(df, dataset_id)
+                data = await translator.translate_records(data, dataset_id)
             except Exception as e:
                 logger.warning(f"Translation failed for {dataset_id}: {e}")
                 # Continue with untranslated data
 
-        if params.compact and (len(df) > 100 or len(df.columns) > 10):
-            summary = [
-                f"QUERY RESULT: {dataset_id}",
-                f"Rows: {len(df)}, Columns: {len(df.columns)}",
-                f"Columns: {', '.join(df.columns.tolist())}",
-                "---",
-                "SAMPLE (first 5 rows):",
-                df.head(5).to_csv(index=False)
-            ]
-            return "\n".join(summary)
+        columns = list(data[0].keys())
+        if params.compact and (len(data) > 100 or len(columns) > 10):
+            return _compact_query_result(dataset_id, len(data), columns, records_to_csv(data[:5]))
 
-        return df.to_csv(index=False)
+        return records_to_csv(data)
 
     except Exception as e:
         return handle_http_error(e, "cbs_query_dataset")
@@ -197,22 +209,30 @@ async def cbs_inspect_dataset_details(ctx: Context, params: DatasetIdInput) -> s
     logger.info(f"Inspecting dataset: {dataset_id}")
     output = []
 
-    # Check if CBS dataset exists
-    try:
-        client = await HTTPClientManager.get_client()
-        odata_url = f"{settings.data_base_url}/{dataset_id}"
-        response = await client.get(odata_url)
-        is_cbs = response.status_code == 200
-    except:
-        is_cbs = False
+    # The existence probe, structure (DataProperties, cached), sample data (3 rows only)
+    # and catalog load are independent, so issue them concurrently
+    client = await HTTPClientManager.get_client()
+    odata_url = f"{DATA_BASE_URL}/{dataset_id}"
+    prop_url = f"{DATA_BASE_URL}/{dataset_id}/DataProperties?$format=json"
+    data_url = f"{DATA_BASE_URL}/{dataset_id}/TypedDataSet?$format=json&$top=3"
+    catalog_load = load_catalog_cache(ctx) if not catalog_cache.is_loaded else asyncio.sleep(0)
+    probe, props_data, sample_resp, _ = await asyncio.gather(
+        resource_exists(odata_url),
+        fetch_metadata_json(prop_url),
+        client.get(data_url),
+        catalog_load,
+        return_exceptions=True
+    )
+    is_cbs = probe is True
 
     if not is_cbs:
         # Check data.overheid.nl
         ckan_url = f"{settings.ckan_base_url}/package_show?id={dataset_id}"
         try:
             response = await client.get(ckan_url)
-            if response.status_code == 200 and response.json().get('success'):
-                pkg = response.json()['result']
+            payload = json_loads(response.content) if response.status_code == 200 else {}
+            if payload.get('success'):
+                pkg = payload['result']
                 output.append(f"DATASET: {dataset_id} (data.overheid.nl - Download only)")
                 output.append(f"Title: {pkg.get('title')}")
                 desc = (pkg.get('notes') or '')[:200]
@@ -224,57 +244,54 @@ async def cbs_inspect_dataset_details(ctx: Context, params: DatasetIdInput) -> s
         return f"Dataset '{dataset_id}' not found in CBS or data.overheid.nl"
 
     # Get title from catalog
-    if not catalog_cache.is_loaded:
-        await load_catalog_cache(ctx)
-    cbs_match = next((item for item in catalog_cache.data if item.get('Identifier') == dataset_id), None)
-    title = cbs_match.get('Title', 'Unknown') if cbs_match else 'Unknown'
+    idx = catalog_cache.find(dataset_id)
+    title = (catalog_cache.data[idx].get('Title') or 'Unknown') if idx is not None else 'Unknown'
 
     output.append(f"DATASET: {dataset_id}")
     output.append(f"Title: {title}")
     output.append("-" * 50)
 
-    # Fetch structure (DataProperties) - compact format
+    # Structure - compact format
     try:
-        prop_url = f"{settings.data_base_url}/{dataset_id}/DataProperties?$format=json"
-        resp = await client.get(prop_url)
-        if resp.status_code == 200:
-            props = resp.json().get('value', [])
-            dimensions = [p for p in props if p.get('Type') == 'Dimension']
-            topics = [p for p in props if p.get('Type') == 'Topic']
-
-            output.append(f"DIMENSIONS ({len(dimensions)}):")
-            for d in dimensions[:10]:  # Limit to 10
-                output.append(f"  {d.get('Key')}: {d.get('Title')}")
-            if len(dimensions) > 10:
-                output.append(f"  ... and {len(dimensions) - 10} more")
-
-            output.append(f"MEASURES ({len(topics)}):")
-            for t in topics[:8]:  # Limit to 8
-                output.append(f"  {t.get('Key')}: {t.get('Title')}")
-            if len(topics) > 8:
-                output.append(f"  ... and {len(topics) - 8} more")
+        if isinstance(props_data, BaseException):
+            raise props_data
+        props = props_data.get('value', [])
+        dimensions = [p for p in props if p.get('Type') == 'Dimension']
+        topics = [p for p in props if p.get('Type') == 'Topic']
+
+        output.append(f"DIMENSIONS ({len(dimensions)}):")
+        for d in dimensions[:10]:  # Limit to 10
+            output.append(f"  {d.get('Key')}: {d.get('Title')}")
+        if len(dimensions) > 10:
+            output.append(f"  ... and {len(dimensions) - 10} more")
+
+        output.append(f"MEASURES ({len(topics)}):")
+        for t in topics[:8]:  # Limit to 8
+            output.append(f"  {t.get('Key')}: {t.get('Title')}")
+        if len(topics) > 8:
+            output.append(f"  ... and {len(topics) - 8} more")
     except Exception as e:
         output.append(f"STRUCTURE: Error - {str(e)[:50]}")
 
     output.append("-" * 50)
 
-    # Fetch sample data (3 rows only)
+    # Sample data
     try:
-        data_url = f"{settings.data_base_url}/{dataset_id}/TypedDataSet?$format=json&$top=3"
-        resp = await client.get(data_url)
-        if resp.status_code == 200:
-            records = resp.json().get('value', [])
+        if isinstance(sample_resp, BaseException):
+            raise sample_resp
+        if sample_resp.status_code == 200:
+            records = odata_value(sample_resp)
             if records:
-                df = pd.DataFrame(records)
                 # Translate dimension values
                 try:
-                    df = await translator.translate_dataframe(df, dataset_id)
+                    records = await translator.translate_records(records, dataset_id)
                 except:
                     pass
                 # Limit columns shown
-                cols = df.columns.tolist()[:8]
-                output.append(f"SAMPLE ({len(records)} rows, showing {len(cols)}/{len(df.columns)} cols):")
-                output.append(df[cols].to_csv(index=False))
+                all_cols = list(records[0].keys())
+                cols = all_cols[:8]
+                output.append(f"SAMPLE ({len(records)} rows, showing {len(cols)}/{len(all_cols)} cols):")
+                output.append(records_to_csv([{col: r.get(col) for col in cols} for r in records]))
             else:
                 output.append("SAMPLE: No data")
     except Exception as e:
@@ -16,6 +16,7 @@ from .security import (
     ensure_directory_exists,
     validate_dataset_id,
 )
+from .serialization import json_loads, json_dumps, records_to_csv
 
 __all__ = [
     # Errors
@@ -33,4 +34,8 @@ __all__ = [
     "safe_join_path",
     "ensure_directory_exists",
     "validate_dataset_id",
+    # Serialization
+    "json_loads",
+    "json_dumps",
+    "records_to_csv",
 ]
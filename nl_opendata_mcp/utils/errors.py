@@ -14,8 +14,19 @@ from typing import Optional
 
 import httpx
 
+from .serialization import json_loads
+
 logger = logging.getLogger(__name__)
 
+# Fields that commonly carry the error message in JSON error bodies
+_ERROR_KEYS = ("error", "message", "detail", "error_description", "odata.error")
+
+# Fixed messages for status codes whose wording does not depend on the response
+_STATUS_MESSAGES = {
+    404: "Error: Resource not found. Please check the dataset ID is correct.",
+    403: "Error: Permission denied. Access to this resource is restricted.",
+}
+
 
 class ErrorCategory(str, Enum):
     """Error classification for structured error handling."""
@@ -49,13 +60,13 @@ class MCPError(Exception):
 
     def to_error_string(self) -> str:
         """Convert to user-friendly error string."""
-        base = f"Error: {self.message}"
+        # Formatted on each call, so details added after raising are included
+        detail_suffix = (
+            " [" + ", ".join(f"{k}={v}" for k, v in self.details.items()) + "]" if self.details else ""
+        )
         if self.retry_after:
-            base += f" (retry after {self.retry_after}s)"
-        if self.details:
-            detail_str = ", ".join(f"{k}={v}" for k, v in self.details.items())
-            base += f" [{detail_str}]"
-        return base
+            return f"Error: {self.message} (retry after {self.retry_after}s){detail_suffix}"
+        return f"Error: {self.message}{detail_suffix}"
 
 
 class DatasetNotFoundError(MCPError):
@@ -102,6 +113,33 @@ class PathTraversalError(MCPError):
         )
 
 
+def _response_detail(response: httpx.Response) -> str:
+    """Extract an error message from a response body, or "" if there is none."""
+    if not response.content:
+        return ""
+
+    # Only parse bodies that declare JSON (common for APIs)
+    if "json" in response.headers.get("content-type", "").lower():
+        try:
+            response_json = json_loads(response.content)
+        except ValueError:
+            pass
+        else:
+            if not isinstance(response_json, dict):
+                return str(response_json)
+            error_val = next((response_json[key] for key in _ERROR_KEYS if key in response_json), None)
+            if isinstance(error_val, dict):
+                return error_val.get("message", str(error_val))
+            return str(error_val) if error_val is not None else str(response_json)
+
+    # Fall back to text response
+    try:
+        text = response.text.strip()
+    except Exception:
+        return ""
+    return text if len(text) < 500 else ""  # Only include if reasonable length
+
+
 def handle_http_error(e: Exception, context: str = "") -> str:
     """
     Convert HTTP exceptions to user-friendly error strings.
@@ -114,7 +152,7 @@ def handle_http_error(e: Exception, context: str = "") -> str:
         User-friendly error message string
     """
     if context:
-        logger.error(f"{context}: {e}")
+        logger.error("%s: %s", context, e)
 
     if isinstance(e, MCPError):
         return e.to_error_string()
@@ -123,37 +161,11 @@ def handle_http_error(e: Exception, context: str = "") -> str:
         status = e.response.status_code
 
         # Try to extract actual error message from response body
-        response_detail = ""
-        try:
-            # Try JSON response first (common for APIs)
-            response_json = e.response.json()
-            if isinstance(response_json, dict):
-                # Common error message field names
-                for key in ("error", "message", "detail", "error_description", "odata.error"):
-                    if key in response_json:
-                        error_val = response_json[key]
-                        if isinstance(error_val, dict):
-                            response_detail = error_val.get("message", str(error_val))
-                        else:
-                            response_detail = str(error_val)
-                        break
-                if not response_detail:
-                    response_detail = str(response_json)
-        except Exception:
-            # Fall back to text response
-            try:
-                text = e.response.text.strip()
-                if text and len(text) < 500:  # Only include if reasonable length
-                    response_detail = text
-            except Exception:
-                pass
-
+        response_detail = _response_detail(e.response)
         detail_suffix = f" Details: {response_detail}" if response_detail else ""
 
-        if status == 404:
-            return f"Error: Resource not found. Please check the dataset ID is correct.{detail_suffix}"
-        elif status == 403:
-            return f"Error: Permission denied. Access to this resource is restricted.{detail_suffix}"
+        if status in _STATUS_MESSAGES:
+            return _STATUS_MESSAGES[status] + detail_suffix
         elif status == 429:
             retry_after = int(e.response.headers.get("Retry-After", 60))
             return f"Error: Rate limit exceeded. Please wait {retry_after}s before making more requests.{detail_suffix}"
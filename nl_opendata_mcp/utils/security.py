@@ -10,34 +10,35 @@ This module provides security and validation utilities:
 import os
 import re
 import logging
+from functools import lru_cache
 from typing import Optional
 
 from .errors import ValidationError, PathTraversalError
 
 logger = logging.getLogger(__name__)
 
-# Allowed OData operators and functions
-ODATA_OPERATORS = frozenset([
-    'eq', 'ne', 'gt', 'lt', 'ge', 'le',
-    'and', 'or', 'not',
-    'add', 'sub', 'mul', 'div', 'mod'
-])
-
-ODATA_FUNCTIONS = frozenset([
-    'substringof', 'startswith', 'endswith',
-    'length', 'indexof', 'replace', 'substring',
-    'tolower', 'toupper', 'trim', 'concat',
-    'year', 'month', 'day', 'hour', 'minute', 'second',
-    'round', 'floor', 'ceiling'
-])
-
 # Pattern for potentially dangerous characters
 DANGEROUS_PATTERN = re.compile(r'[;<>{}|\\\x00-\x1f]')
 
+# Pattern for a whole comma-joined select list of valid identifiers (max 128 chars each)
+COLUMN_LIST_PATTERN = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]{0,127}(?:,[a-zA-Z_][a-zA-Z0-9_]{0,127})*')
+
+# Pattern for an acceptable basename: non-empty, no leading dot, no null bytes
+SAFE_FILENAME_PATTERN = re.compile(r'[^.\x00][^\x00]*')
+
+# Pattern for everything except parentheses (paren balance check)
+NON_PAREN_PATTERN = re.compile(r'[^()]+')
+
 # Pattern for valid OData identifiers
 IDENTIFIER_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
 
+# Pattern for valid dataset IDs (CBS identifiers and data.overheid.nl slugs)
+DATASET_ID_PATTERN = re.compile(r'[a-zA-Z0-9_-]+')
+
 
+# The validators are pure and see the same strings repeatedly across tool
+# calls, so results are memoized. Failures raise and are never cached.
+@lru_cache(maxsize=512)
 def sanitize_odata_filter(filter_str: Optional[str]) -> Optional[str]:
     """
     Sanitize OData filter string to prevent injection attacks.
@@ -58,33 +59,28 @@ def sanitize_odata_filter(filter_str: Optional[str]) -> Optional[str]:
     if not filter_str:
         return None
 
-    # Check for dangerous characters
-    if DANGEROUS_PATTERN.search(filter_str):
+    # Check for excessively long filters (potential DoS), before any scan of the text
+    if len(filter_str) > 2000:
         raise ValidationError(
-            "Filter contains invalid characters",
+            "Filter is too long (max 2000 characters)",
             field="filter"
         )
 
-    # Check for excessively long filters (potential DoS)
-    if len(filter_str) > 2000:
+    # Check for dangerous characters
+    if DANGEROUS_PATTERN.search(filter_str):
         raise ValidationError(
-            "Filter is too long (max 2000 characters)",
+            "Filter contains invalid characters",
             field="filter"
         )
 
-    # Check for balanced parentheses
-    paren_count = 0
-    for char in filter_str:
-        if char == '(':
-            paren_count += 1
-        elif char == ')':
-            paren_count -= 1
-        if paren_count < 0:
-            raise ValidationError(
-                "Filter has unbalanced parentheses",
-                field="filter"
-            )
-    if paren_count != 0:
+    # Check for balanced parentheses in one pass over the parens only: the
+    # depth must never go negative (e.g. ")(") and must end at zero
+    depth = 0
+    for paren in NON_PAREN_PATTERN.sub('', filter_str):
+        depth += 1 if paren == '(' else -1
+        if depth < 0:
+            break
+    if depth != 0:
         raise ValidationError(
             "Filter has unbalanced parentheses",
             field="filter"
@@ -98,7 +94,7 @@ def sanitize_odata_filter(filter_str: Optional[str]) -> Optional[str]:
             field="filter"
         )
 
-    logger.debug(f"Sanitized OData filter: {filter_str}")
+    logger.debug("Sanitized OData filter: %s", filter_str)
     return filter_str
 
 
@@ -119,7 +115,7 @@ def sanitize_column_name(name: str) -> str:
     if not name:
         raise ValidationError("Column name cannot be empty", field="select")
 
-    if not IDENTIFIER_PATTERN.match(name):
+    if not IDENTIFIER_PATTERN.fullmatch(name):
         raise ValidationError(
             f"Invalid column name: '{name}'. Must start with letter/underscore and contain only alphanumeric characters.",
             field="select"
@@ -147,7 +143,35 @@ def sanitize_select_columns(columns: Optional[list[str]]) -> Optional[list[str]]
     if columns is None:
         return None
 
-    return [sanitize_column_name(col) for col in columns]
+    return list(_sanitize_column_tuple(tuple(columns)))
+
+
+@lru_cache(maxsize=512)
+def _sanitize_column_tuple(columns: tuple[str, ...]) -> tuple[str, ...]:
+    """Memoized core of sanitize_select_columns (tuples are hashable, lists are not)."""
+    # Validate the whole list in one regex pass; only a failing list is
+    # re-checked per column, to report which name is invalid
+    stripped = tuple(col.strip() for col in columns)
+    joined = ",".join(stripped)
+    # The comma count guards against a single name containing a comma
+    if joined.count(",") == len(stripped) - 1 and COLUMN_LIST_PATTERN.fullmatch(joined):
+        return stripped
+    return tuple(sanitize_column_name(col) for col in columns)
+
+
+@lru_cache(maxsize=64)
+def _normalized_base(base_dir: str) -> str:
+    """Normalized form of an absolute base directory (resolved once per directory)."""
+    return os.path.abspath(base_dir)
+
+
+def _abs_base(base_dir: str) -> str:
+    """Absolute form of a base directory."""
+    # A relative base (the default "./downloads") depends on the current
+    # working directory, so only absolute bases are memoized
+    if os.path.isabs(base_dir):
+        return _normalized_base(base_dir)
+    return os.path.abspath(base_dir)
 
 
 def safe_join_path(base_dir: str, filename: str) -> str:
@@ -168,35 +192,38 @@ def safe_join_path(base_dir: str, filename: str) -> str:
     if not filename:
         raise ValidationError("Filename cannot be empty", field="file_name")
 
-    # Normalize base directory to absolute path
-    base = os.path.abspath(base_dir)
-
     # Remove any path components from filename (keep only the basename)
     # This prevents ../../../etc/passwd style attacks
     safe_filename = os.path.basename(filename)
 
-    if not safe_filename:
-        raise ValidationError(
-            "Invalid filename after sanitization",
-            field="file_name"
-        )
+    # One regex pass accepts ordinary names; only rejected names go through
+    # the individual checks, to pick the error message
+    if not SAFE_FILENAME_PATTERN.fullmatch(safe_filename):
+        if not safe_filename:
+            raise ValidationError(
+                "Invalid filename after sanitization",
+                field="file_name"
+            )
 
-    # Additional checks on filename
-    if safe_filename.startswith('.'):
-        raise ValidationError(
-            "Filename cannot start with a dot",
-            field="file_name"
-        )
+        # Additional checks on filename
+        if safe_filename.startswith('.'):
+            raise ValidationError(
+                "Filename cannot start with a dot",
+                field="file_name"
+            )
 
-    # Check for null bytes
-    if '\x00' in safe_filename:
+        # Null bytes
         raise ValidationError(
             "Filename contains invalid characters",
             field="file_name"
         )
 
-    # Build and verify the full path
-    full_path = os.path.abspath(os.path.join(base, safe_filename))
+    # Normalize base directory to absolute path, only once the name is accepted
+    base = _abs_base(base_dir)
+
+    # Build and verify the full path. The basename has no separators and
+    # cannot be '.' or '..' (dotfiles are rejected), so no normalization is needed.
+    full_path = os.path.join(base, safe_filename)
 
     # Verify the path is within base directory
     if not full_path.startswith(base + os.sep) and full_path != base:
@@ -215,6 +242,7 @@ def ensure_directory_exists(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
+@lru_cache(maxsize=1024)
 def validate_dataset_id(dataset_id: str) -> str:
     """
     Validate CBS dataset ID format.
@@ -242,7 +270,7 @@ def validate_dataset_id(dataset_id: str) -> str:
     # CBS dataset IDs typically match pattern like "85313NED" or "83583NED"
     # But data.overheid.nl IDs can be slugs like "groningen-parkeervakken"
     # Allow alphanumeric, hyphens, and underscores
-    if not re.match(r'^[a-zA-Z0-9_-]+$', dataset_id):
+    if not DATASET_ID_PATTERN.fullmatch(dataset_id):
         raise ValidationError(
             "Dataset ID contains invalid characters. Use only alphanumeric characters, hyphens, and underscores.",
             field="dataset_id"
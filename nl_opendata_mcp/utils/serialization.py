@@ -0,0 +1,78 @@
+"""
+JSON serialization utilities for nl-opendata-mcp server.
+
+This module wraps orjson so response bodies are decoded straight from
+bytes, without the UTF-8 decode pass and stdlib parser behind
+`httpx.Response.json()`:
+    - json_loads: Parse a JSON document from bytes or str
+    - json_dumps: Serialize an object to an indented JSON string
+    - records_to_csv: Write a list of OData records as CSV text
+"""
+import csv
+from io import StringIO
+from typing import Any
+
+import orjson
+
+
+def json_loads(data: bytes | str) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: Raw JSON, typically `response.content`
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        orjson.JSONDecodeError: If the document is not valid JSON
+            (a subclass of json.JSONDecodeError and ValueError)
+    """
+    return orjson.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+    """
+    Serialize an object to JSON indented by two spaces.
+
+    Key order is preserved and non-ASCII text is written as-is rather than
+    escaped, so Dutch titles stay readable.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        JSON string
+    """
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+
+def records_to_csv(records: list[dict]) -> str:
+    """
+    Write a list of records as CSV, without building a DataFrame.
+
+    Columns are the union of all record keys, in first-seen order; missing
+    and None values are written as empty fields.
+
+    Args:
+        records: Rows as decoded from an OData 'value' array
+
+    Returns:
+        CSV text with a header row
+    """
+    output = StringIO()
+    first = tuple(records[0]) if records else ()
+    if all(tuple(record) == first for record in records):
+        # OData rows share one key order: write values straight through csv.writer
+        # instead of the per-row key lookups and checks of DictWriter
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow(first)
+        writer.writerows(map(dict.values, records))
+        return output.getvalue()
+
+    fieldnames = list(dict.fromkeys(key for record in records for key in record))
+    writer = csv.DictWriter(output, fieldnames=fieldnames, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(records)
+    return output.getvalue()
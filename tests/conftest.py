@@ -1,20 +1,20 @@
 """
 Pytest configuration and fixtures for nl-opendata-mcp tests.
 """
-import pytest
+import asyncio
 import os
-import sys
+
+import pytest
 
 # Enable python analysis for tests
 os.environ["NL_OPENDATA_MCP_USE_PYTHON_ANALYSIS"] = "true"
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 
 class MockContext:
     """Mock FastMCP context for testing tools."""
 
+    __slots__ = ("info_messages", "error_messages", "warning_messages")
+
     def __init__(self):
         self.info_messages = []
         self.error_messages = []
@@ -22,15 +22,12 @@ class MockContext:
 
     def info(self, msg: str):
         self.info_messages.append(msg)
-        print(f"[INFO] {msg}")
 
     def error(self, msg: str):
         self.error_messages.append(msg)
-        print(f"[ERROR] {msg}")
 
     def warning(self, msg: str):
         self.warning_messages.append(msg)
-        print(f"[WARNING] {msg}")
 
     def clear(self):
         self.info_messages.clear()
@@ -38,12 +35,96 @@ class MockContext:
         self.warning_messages.clear()
 
 
+class NullContext:
+    """Context that discards all messages, for fast runs of chatty tools."""
+
+    __slots__ = ()
+
+    def info(self, msg: str):
+        pass
+
+    def error(self, msg: str):
+        pass
+
+    def warning(self, msg: str):
+        pass
+
+    def clear(self):
+        pass
+
+
 @pytest.fixture
 def mock_context():
     """Provide a mock context for tool testing."""
     return MockContext()
 
 
+@pytest.fixture
+def ctx():
+    """
+    Provide a context for tool calls in tests that don't inspect messages.
+
+    Set NL_OPENDATA_FAST_TESTS=1 to discard messages instead of recording
+    them.
+    """
+    return NullContext() if os.environ.get("NL_OPENDATA_FAST_TESTS") else MockContext()
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def http_client():
+    """Close the shared HTTP client once, after every test has reused it."""
+    from nl_opendata_mcp.services import HTTPClientManager
+    yield HTTPClientManager
+    await HTTPClientManager.close()
+
+
+@pytest.fixture
+def downloads(monkeypatch, tmp_path):
+    """
+    Send saved datasets and the dataset cache to tmp_path.
+
+    Each test gets its own downloads directory and dataset cache file, so
+    save tests never see files or cache entries left by another test.
+    """
+    from nl_opendata_mcp.services.cache import DatasetCache
+    from nl_opendata_mcp.tools import export
+
+    monkeypatch.setattr(export.settings, "downloads_path", str(tmp_path))
+    monkeypatch.setattr(export, "dataset_cache", DatasetCache(cache_file=str(tmp_path / "dataset_cache.json")))
+    return tmp_path
+
+
+# Datasets the live test modules share
+WARM_DATASET_IDS = ("85313NED", "83765NED")
+
+
+@pytest.fixture(scope="session")
+async def warm_cache():
+    """
+    Load the catalog and the info/structure metadata of the shared datasets once.
+
+    Later tool calls in the session are then served from catalog_cache and
+    metadata_cache. Live modules opt in with pytest.mark.usefixtures.
+    """
+    from nl_opendata_mcp import server
+    from nl_opendata_mcp.models import GetMetadataInput, MetadataType
+    from nl_opendata_mcp.services.cache import catalog_cache, metadata_cache
+    from nl_opendata_mcp.tools.base import load_catalog_cache
+
+    context = NullContext()
+    fn = get_fn(server.cbs_get_metadata)
+    await load_catalog_cache(context)
+    await asyncio.gather(*(
+        fn(context, GetMetadataInput(dataset_id=dataset_id, metadata_type=metadata_type))
+        for dataset_id in WARM_DATASET_IDS
+        for metadata_type in (MetadataType.INFO, MetadataType.STRUCTURE)
+    ))
+
+    assert catalog_cache.is_loaded, "Catalog warm-up failed"
+    assert len(metadata_cache) >= 2 * len(WARM_DATASET_IDS), "Metadata warm-up failed"
+    return catalog_cache
+
+
 @pytest.fixture
 def settings():
     """Provide settings instance."""
@@ -53,6 +134,4 @@ def settings():
 
 def get_fn(tool):
     """Extract the callable function from a FunctionTool wrapper."""
-    if hasattr(tool, 'fn'):
-        return tool.fn
-    return tool
+    return getattr(tool, 'fn', tool)
@@ -3,16 +3,11 @@
 Tests for cache functionality.
 """
 import pytest
-import sys
+import asyncio
 import os
-import json
-import tempfile
 from datetime import datetime, timedelta
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from nl_opendata_mcp.services.cache import CatalogCache, DatasetCache, CacheEntry
+from nl_opendata_mcp.services.cache import CatalogCache, DatasetCache, ResponseCache, CacheEntry
 
 
 class TestCacheEntry:
@@ -39,144 +34,185 @@ class TestCacheEntry:
         entry = CacheEntry.create({"test": "data"}, ttl_hours=24)
         assert entry.age_hours < 1  # Just created
 
+    def test_age_from_created_at(self):
+        """Test age is measured from the stored creation timestamp."""
+        created = datetime.now() - timedelta(hours=5)
+        entry = CacheEntry(
+            data=None,
+            created_at=created.isoformat(),
+            expires_at=(created + timedelta(hours=24)).isoformat()
+        )
+        assert 4.9 < entry.age_hours < 5.1
+        assert not entry.is_expired
+
 
 class TestCatalogCache:
     """Tests for CatalogCache class."""
 
-    def test_initial_state(self):
+    def test_initial_state(self, tmp_path):
         """Test initial cache state."""
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
-            cache_file = f.name
-
-        try:
-            # Remove the file to start clean
-            os.remove(cache_file)
-            cache = CatalogCache(cache_file=cache_file, ttl_hours=24)
-            assert not cache.is_loaded
-            assert cache.data == []
-        finally:
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
-
-    def test_save_and_load(self):
+        cache = CatalogCache(cache_file=str(tmp_path / "cache.json"), ttl_hours=24)
+        assert not cache.is_loaded
+        assert cache.data == []
+
+    def test_save_and_load(self, tmp_path):
         """Test saving and loading cache."""
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
-            cache_file = f.name
-
-        try:
-            # Create and save
-            cache1 = CatalogCache(cache_file=cache_file, ttl_hours=24)
-            cache1.data = [{"id": "1"}, {"id": "2"}]
-
-            # Load in new instance
-            cache2 = CatalogCache(cache_file=cache_file, ttl_hours=24)
-            assert len(cache2.data) == 2
-            assert cache2.data[0]["id"] == "1"
-        finally:
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
-
-    def test_clear_cache(self):
-        """Test clearing cache."""
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
-            cache_file = f.name
+        cache_file = str(tmp_path / "cache.json")
 
-        try:
-            cache = CatalogCache(cache_file=cache_file, ttl_hours=24)
-            cache.data = [{"id": "1"}]
-            cache.clear()
+        # Create and save
+        cache1 = CatalogCache(cache_file=cache_file, ttl_hours=24)
+        cache1.data = [{"id": "1"}, {"id": "2"}]
 
-            assert cache.data == []
-            assert not os.path.exists(cache_file)
-        finally:
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+        # Load in new instance
+        cache2 = CatalogCache(cache_file=cache_file, ttl_hours=24)
+        assert len(cache2.data) == 2
+        assert cache2.data[0]["id"] == "1"
 
-    def test_stats(self):
+    def test_clear_cache(self, tmp_path):
+        """Test clearing cache."""
+        cache_file = str(tmp_path / "cache.json")
+        cache = CatalogCache(cache_file=cache_file, ttl_hours=24)
+        cache.data = [{"id": "1"}]
+        cache.clear()
+
+        assert cache.data == []
+        assert not os.path.exists(cache_file)
+
+    def test_stats(self, tmp_path):
         """Test cache statistics."""
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
-            cache_file = f.name
+        cache = CatalogCache(cache_file=str(tmp_path / "cache.json"), ttl_hours=24)
+        cache.data = [{"id": "1"}, {"id": "2"}]
 
-        try:
-            cache = CatalogCache(cache_file=cache_file, ttl_hours=24)
-            cache.data = [{"id": "1"}, {"id": "2"}]
+        stats = cache.get_stats()
+        assert stats["count"] == 2
+        assert stats["ttl_hours"] == 24
+        assert stats["loaded"] == True
 
-            stats = cache.get_stats()
-            assert stats["count"] == 2
-            assert stats["ttl_hours"] == 24
-            assert stats["loaded"] == True
-        finally:
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+    def test_find(self, tmp_path):
+        """Test the identifier index stays aligned with cached records."""
+        cache_file = str(tmp_path / "cache.json")
+        cache = CatalogCache(cache_file=cache_file, ttl_hours=24)
+        cache.data = [
+            {"Identifier": "85313NED", "Title": "Bevolking", "Summary": None},
+            {"Identifier": "83765NED", "Title": "Kerncijfers", "Summary": "Wijken en buurten"},
+        ]
+
+        assert cache.find("83765NED") == 1
+        assert cache.data[cache.find("83765NED")]["Title"] == "Kerncijfers"
+        assert cache.find("UNKNOWN") is None
+
+        # The index is rebuilt when loading from disk
+        cache2 = CatalogCache(cache_file=cache_file, ttl_hours=24)
+        assert cache2.find("85313NED") == 0
 
 
 class TestDatasetCache:
     """Tests for DatasetCache class."""
 
-    def test_set_and_get(self):
+    def test_set_and_get(self, tmp_path):
         """Test setting and getting cache entries."""
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
-            cache_file = f.name
-
-        try:
-            cache = DatasetCache(cache_file=cache_file)
-            cache.set("/path/to/file.csv", "85313NED", 1000)
-
-            entry = cache.get("/path/to/file.csv")
-            assert entry is not None
-            assert entry["dataset_id"] == "85313NED"
-            assert entry["records"] == 1000
-        finally:
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
-
-    def test_exists_with_file(self):
-        """Test exists check when file exists."""
-        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
-            file_path = f.name
-            f.write(b"test")
+        cache = DatasetCache(cache_file=str(tmp_path / "cache.json"))
+        cache.set("/path/to/file.csv", "85313NED", 1000)
 
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
-            cache_file = f.name
+        entry = cache.get("/path/to/file.csv")
+        assert entry is not None
+        assert entry["dataset_id"] == "85313NED"
+        assert entry["records"] == 1000
 
-        try:
-            cache = DatasetCache(cache_file=cache_file)
-            cache.set(file_path, "85313NED", 100)
+    def test_exists_with_file(self, tmp_path):
+        """Test exists check when file exists."""
+        file_path = tmp_path / "data.csv"
+        file_path.write_bytes(b"test")
 
-            assert cache.exists(file_path) == True
-        finally:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+        cache = DatasetCache(cache_file=str(tmp_path / "cache.json"))
+        cache.set(str(file_path), "85313NED", 100)
 
-    def test_exists_without_file(self):
-        """Test exists check when file doesn't exist."""
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
-            cache_file = f.name
+        assert cache.exists(str(file_path)) == True
 
-        try:
-            cache = DatasetCache(cache_file=cache_file)
-            cache.set("/nonexistent/file.csv", "85313NED", 100)
+    def test_exists_without_file(self, tmp_path):
+        """Test exists check when file doesn't exist."""
+        cache = DatasetCache(cache_file=str(tmp_path / "cache.json"))
+        cache.set("/nonexistent/file.csv", "85313NED", 100)
 
-            # Should return False and remove stale entry
-            assert cache.exists("/nonexistent/file.csv") == False
-            assert cache.get("/nonexistent/file.csv") is None
-        finally:
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+        # Should return False and remove stale entry
+        assert cache.exists("/nonexistent/file.csv") == False
+        assert cache.get("/nonexistent/file.csv") is None
 
-    def test_remove_entry(self):
+    def test_remove_entry(self, tmp_path):
         """Test removing cache entry."""
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
-            cache_file = f.name
-
-        try:
-            cache = DatasetCache(cache_file=cache_file)
-            cache.set("/path/to/file.csv", "85313NED", 100)
-            cache.remove("/path/to/file.csv")
-
-            assert cache.get("/path/to/file.csv") is None
-        finally:
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+        cache = DatasetCache(cache_file=str(tmp_path / "cache.json"))
+        cache.set("/path/to/file.csv", "85313NED", 100)
+        cache.remove("/path/to/file.csv")
+
+        assert cache.get("/path/to/file.csv") is None
+
+
+class TestResponseCache:
+    """Tests for ResponseCache class."""
+
+    def test_set_and_get(self):
+        """Test storing and retrieving a response."""
+        cache = ResponseCache(ttl_seconds=60)
+        cache.set("url", "Key,Title\n")
+
+        assert cache.get("url") == "Key,Title\n"
+        assert cache.get("other") is None
+
+    def test_expired_entry(self):
+        """Test that expired entries are dropped."""
+        cache = ResponseCache(ttl_seconds=60)
+        cache.set("url", "value")
+        cache._entries["url"] = (cache._entries["url"][0] - 61, "value")
+
+        assert cache.get("url") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = ResponseCache(ttl_seconds=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_disabled_with_zero_ttl(self):
+        """Test that a zero TTL disables caching."""
+        cache = ResponseCache(ttl_seconds=0)
+        cache.set("url", "value")
+
+        assert cache.get("url") is None
+
+    @pytest.mark.asyncio
+    async def test_get_or_fetch_single_flight(self):
+        """Test that concurrent misses for one key share a single fetch."""
+        cache = ResponseCache(ttl_seconds=60)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": []}
+
+        results = await asyncio.gather(*(cache.get_or_fetch("url", fetch) for _ in range(5)))
+
+        assert len(calls) == 1
+        assert all(r == {"value": []} for r in results)
+
+    @pytest.mark.asyncio
+    async def test_get_or_fetch_does_not_cache_errors(self):
+        """Test that a failed fetch is retried on the next call."""
+        cache = ResponseCache(ttl_seconds=60)
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        async def succeeding():
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("url", failing)
+        assert await cache.get_or_fetch("url", succeeding) == "ok"
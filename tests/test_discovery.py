@@ -2,11 +2,6 @@
 Tests for dataset discovery tools (list, search, check availability).
 """
 import pytest
-import sys
-import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from nl_opendata_mcp import server
 from nl_opendata_mcp.models import (
@@ -15,26 +10,10 @@ from nl_opendata_mcp.models import (
     SearchField,
     DatasetIdInput,
 )
+from .conftest import get_fn
 
 # Every test in this module makes live HTTP calls to the CBS OData API.
-pytestmark = pytest.mark.live
-
-
-class MockContext:
-    """Mock FastMCP context for testing."""
-    def info(self, msg): print(f"[INFO] {msg}")
-    def error(self, msg): print(f"[ERROR] {msg}")
-    def warning(self, msg): print(f"[WARNING] {msg}")
-
-
-def get_fn(tool):
-    """Extract callable from FunctionTool wrapper."""
-    return tool.fn if hasattr(tool, 'fn') else tool
-
-
-@pytest.fixture
-def ctx():
-    return MockContext()
+pytestmark = [pytest.mark.live, pytest.mark.usefixtures("warm_cache")]
 
 
 @pytest.mark.asyncio
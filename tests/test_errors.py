@@ -0,0 +1,79 @@
+"""
+Tests for error handling utilities.
+"""
+import httpx
+
+from nl_opendata_mcp.utils import handle_http_error, ErrorCategory, MCPError, ValidationError
+
+
+def status_error(status: int, content: bytes = b"", content_type: str = "") -> httpx.HTTPStatusError:
+    """Build an HTTPStatusError for a response with the given body."""
+    headers = {"content-type": content_type} if content_type else {}
+    request = httpx.Request("GET", "https://example.com/85313NED")
+    response = httpx.Response(status, content=content, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class TestHandleHttpError:
+    """Tests for handle_http_error."""
+
+    def test_not_found_without_body(self):
+        """Test the fixed 404 message is returned without details."""
+        result = handle_http_error(status_error(404))
+        assert result == "Error: Resource not found. Please check the dataset ID is correct."
+
+    def test_json_error_message(self):
+        """Test the message is taken from a nested OData error object."""
+        body = b'{"odata.error": {"code": "", "message": "Invalid filter"}}'
+        result = handle_http_error(status_error(400, body, "application/json;odata=verbose"))
+        assert result == "Error: API request failed with status 400. Details: Invalid filter"
+
+    def test_json_content_type_case_insensitive(self):
+        """Test the JSON content type is recognized regardless of case."""
+        result = handle_http_error(status_error(400, b'{"message": "Bad select"}', "Application/JSON"))
+        assert result.endswith("Details: Bad select")
+
+    def test_invalid_json_falls_back_to_text(self):
+        """Test a body declared as JSON but not parseable is shown as text."""
+        result = handle_http_error(status_error(500, b"Internal error", "application/json"))
+        assert "status 500" in result
+        assert result.endswith("Details: Internal error")
+
+    def test_text_body(self):
+        """Test non-JSON bodies are included as text."""
+        result = handle_http_error(status_error(403, b"Forbidden", "text/plain"))
+        assert result == "Error: Permission denied. Access to this resource is restricted. Details: Forbidden"
+
+    def test_long_text_body_omitted(self):
+        """Test very long bodies are left out of the message."""
+        result = handle_http_error(status_error(502, b"x" * 600, "text/html"))
+        assert "Details" not in result
+
+    def test_rate_limit_retry_after(self):
+        """Test 429 uses the Retry-After header."""
+        error = status_error(429)
+        error.response.headers["Retry-After"] = "7"
+        assert "wait 7s" in handle_http_error(error)
+
+    def test_mcp_error(self):
+        """Test MCP errors are rendered with their own formatting."""
+        assert handle_http_error(ValidationError("Bad", field="filter")) == "Error: Bad [field=filter]"
+
+
+class TestMCPErrorString:
+    """Tests for MCPError.to_error_string."""
+
+    def test_plain_message(self):
+        """Test an error without details or retry hint."""
+        assert ValidationError("Bad input").to_error_string() == "Error: Bad input"
+
+    def test_retry_after(self):
+        """Test the retry hint comes before the details."""
+        error = MCPError("Busy", ErrorCategory.EXTERNAL, retry_after=30, details={"dataset_id": "85313NED"})
+        assert error.to_error_string() == "Error: Busy (retry after 30s) [dataset_id=85313NED]"
+
+    def test_details_added_after_raise(self):
+        """Test details added to a caught error appear in its string."""
+        error = ValidationError("Bad input")
+        error.details["field"] = "top"
+        assert error.to_error_string() == "Error: Bad input [field=top]"
@@ -0,0 +1,287 @@
+"""
+Offline tests for dataset export and pagination (HTTP layer mocked).
+"""
+import pytest
+import httpx
+import pandas as pd
+
+from nl_opendata_mcp.models import AnalyzeLocalInput, SaveDatasetInput
+from nl_opendata_mcp.services import http_client
+from nl_opendata_mcp.tools import analysis, export
+
+
+def make_fetch(total_records: int, count: bool = True, row=None, properties=None):
+    """
+    Build a fake fetch_with_retry serving `total_records` rows of TypedDataSet.
+
+    When `count` is False the $count endpoint fails, as on servers without it.
+    `row` builds the record for a row number, and `properties` is served as
+    DataProperties (which fails when it is None).
+    """
+    requested = []
+    row = row or (lambda i: {"ID": i, "Waarde": i * 10})
+
+    async def fake_fetch(url, *args, **kwargs):
+        request = httpx.Request("GET", url)
+        if url.endswith("/$count"):
+            if not count:
+                raise httpx.HTTPStatusError("Not Found", request=request, response=httpx.Response(404, request=request))
+            return httpx.Response(200, text=str(total_records), request=request)
+        if "/DataProperties" in url:
+            if properties is None:
+                raise httpx.HTTPStatusError("Not Found", request=request, response=httpx.Response(404, request=request))
+            return httpx.Response(200, json={"value": properties}, request=request)
+        query = dict(part.split("=", 1) for part in url.split("?", 1)[1].split("&"))
+        top, skip = int(query["$top"]), int(query.get("$skip", 0))
+        requested.append(skip)
+        rows = [row(i) for i in range(skip, min(skip + top, total_records))]
+        return httpx.Response(200, json={"value": rows}, request=request)
+
+    return fake_fetch, requested
+
+
+def patch_fetch(monkeypatch, fake_fetch):
+    """Route the record count probe and page requests through `fake_fetch`."""
+    monkeypatch.setattr(http_client, "fetch_with_retry", fake_fetch)
+    monkeypatch.setattr(export, "fetch_with_retry", fake_fetch)
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(export.settings, "batch_size", 10)
+    monkeypatch.setattr(export.settings, "http_concurrency", 3)
+
+
+@pytest.mark.asyncio
+async def test_pages_yielded_in_order(monkeypatch, small_batches, mock_context):
+    """All pages are fetched and yielded in skip order."""
+    fake_fetch, requested = make_fetch(45)
+    patch_fetch(monkeypatch, fake_fetch)
+
+    records = []
+    async for page in export._iter_record_pages(mock_context, "85313NED"):
+        records.extend(page)
+
+    assert [r["ID"] for r in records] == list(range(45))
+    assert requested == [0, 10, 20, 30, 40]  # exactly the pages from $count
+    assert not mock_context.warning_messages
+
+
+@pytest.mark.asyncio
+async def test_pagination_without_count(monkeypatch, small_batches, mock_context):
+    """Without $count, pagination runs until the first empty page."""
+    fake_fetch, requested = make_fetch(45, count=False)
+    patch_fetch(monkeypatch, fake_fetch)
+
+    records = []
+    async for page in export._iter_record_pages(mock_context, "85313NED"):
+        records.extend(page)
+
+    assert [r["ID"] for r in records] == list(range(45))
+    assert 50 in requested  # the empty page that ends pagination
+
+
+@pytest.mark.asyncio
+async def test_pagination_respects_limit(monkeypatch, small_batches, mock_context):
+    """Pagination stops at max_records_per_fetch with a warning."""
+    monkeypatch.setattr(export.settings, "max_records_per_fetch", 25)
+    fake_fetch, requested = make_fetch(100)
+    patch_fetch(monkeypatch, fake_fetch)
+
+    records = []
+    async for page in export._iter_record_pages(mock_context, "85313NED"):
+        records.extend(page)
+
+    assert max(requested) <= 25
+    assert len(records) == 30
+    assert mock_context.warning_messages
+
+
+@pytest.mark.asyncio
+async def test_save_all_pages_streams_to_csv(monkeypatch, small_batches, mock_context, tmp_path):
+    """Pages are appended to a single CSV with one header row."""
+    fake_fetch, _ = make_fetch(45)
+    patch_fetch(monkeypatch, fake_fetch)
+    full_path = str(tmp_path / "data.csv")
+
+    total = await export._save_all_pages(mock_context, "85313NED", full_path, translate=False)
+
+    assert total == 45
+    df = pd.read_csv(full_path)
+    assert df["ID"].tolist() == list(range(45))
+    assert not (tmp_path / "data.csv.part").exists()
+
+
+@pytest.mark.asyncio
+async def test_save_all_pages_translates_rows(monkeypatch, small_batches, mock_context, tmp_path):
+    """Dimension values are translated row by row on their way to the CSV."""
+    fake_fetch, _ = make_fetch(15)
+    patch_fetch(monkeypatch, fake_fetch)
+
+    async def fake_mappings(dataset_id, records):
+        return {"ID": {"0": "nul", "1": "een"}}
+
+    monkeypatch.setattr(export, "_get_translation_mappings", fake_mappings)
+    full_path = str(tmp_path / "data.csv")
+
+    total = await export._save_all_pages(mock_context, "85313NED", full_path, translate=True)
+
+    assert total == 15
+    df = pd.read_csv(full_path)
+    assert df["ID"].tolist()[:3] == ["nul", "een", "2"]
+    assert len(df) == 15
+
+
+@pytest.mark.asyncio
+async def test_save_all_pages_empty_dataset(monkeypatch, small_batches, mock_context, tmp_path):
+    """An empty dataset writes no file."""
+    fake_fetch, _ = make_fetch(0)
+    patch_fetch(monkeypatch, fake_fetch)
+    full_path = tmp_path / "data.csv"
+
+    total = await export._save_all_pages(mock_context, "85313NED", str(full_path), translate=False)
+
+    assert total == 0
+    assert not full_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_save_all_pages_fetch_error(monkeypatch, small_batches, mock_context, tmp_path):
+    """A failing page request propagates and leaves no partial file behind."""
+    fake_fetch, _ = make_fetch(100)
+
+    async def failing_fetch(url, *args, **kwargs):
+        if "$skip=40" in url:
+            raise httpx.ConnectError("connection reset")
+        return await fake_fetch(url, *args, **kwargs)
+
+    patch_fetch(monkeypatch, failing_fetch)
+    full_path = tmp_path / "data.csv"
+
+    with pytest.raises(httpx.ConnectError):
+        await export._save_all_pages(mock_context, "85313NED", str(full_path), translate=False)
+
+    assert not full_path.exists()
+    assert not (tmp_path / "data.csv.part").exists()
+
+
+def mixed_row(i):
+    """A row whose measures are whole, or empty, in the first page only."""
+    return {"ID": i, "Waarde": i if i < 10 else i + 0.5, "Aantal": None if i < 10 else i}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("properties", [
+    pytest.param([
+        {"Key": "Waarde", "Type": "Topic", "Datatype": "Double"},
+        {"Key": "Aantal", "Type": "Topic", "Datatype": "Long"},
+    ], id="data-properties"),
+    pytest.param(None, id="widened"),
+])
+async def test_save_all_pages_to_parquet(monkeypatch, small_batches, mock_context, tmp_path, properties):
+    """Pages are written as row groups of a single Parquet file, whatever the first page holds."""
+    pytest.importorskip("pyarrow")
+    fake_fetch, _ = make_fetch(45, row=mixed_row, properties=properties)
+    patch_fetch(monkeypatch, fake_fetch)
+    full_path = str(tmp_path / "data.parquet")
+
+    total = await export._save_all_pages(
+        mock_context, "85313NED", full_path, translate=False,
+        output_format=export.OutputFormat.PARQUET, compression="zstd"
+    )
+
+    assert total == 45
+    df = pd.read_parquet(full_path)
+    assert df["ID"].tolist() == list(range(45))
+    assert df["Waarde"].tolist() == [mixed_row(i)["Waarde"] for i in range(45)]
+    assert df["Aantal"].isna().sum() == 10
+    assert df["Aantal"].tolist()[10:] == list(range(10, 45))
+    assert not (tmp_path / "data.parquet.part").exists()
+
+
+def test_csv_sink_appends_without_header(tmp_path):
+    """Appended pages add rows only, with a single header line."""
+    path = str(tmp_path / "out.csv")
+    sink = export._CsvSink(path)
+    sink.write_records([{"Regio": "Amsterdam, NH", "Waarde": 1}], fieldnames=["Regio", "Waarde"])
+    sink.write_records([{"Regio": "Utrecht", "Waarde": 2}], fieldnames=["Regio", "Waarde"])
+    sink.close()
+
+    with open(path, "rb") as f:
+        assert f.read() == b'Regio,Waarde\n"Amsterdam, NH",1\nUtrecht,2\n'
+    df = pd.read_csv(path)
+    assert df.columns.tolist() == ["Regio", "Waarde"]
+    assert df["Regio"].tolist() == ["Amsterdam, NH", "Utrecht"]
+    assert df["Waarde"].tolist() == [1, 2]
+
+
+@pytest.fixture
+async def offline_save(monkeypatch, downloads):
+    """
+    Serve cbs_save_dataset from an in-memory TypedDataSet.
+
+    The shared client is replaced by one with a mock transport; downloads and
+    the dataset cache go to tmp_path.
+    """
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        top = int(request.url.params.get("$top", 1000))
+        rows = [{"ID": i, "Perioden": f"20{i:02d}JJ00", "Waarde": i * 10} for i in range(min(top, 25))]
+        return httpx.Response(200, json={"value": rows})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        async def get_client():
+            return client
+
+        monkeypatch.setattr(export.HTTPClientManager, "get_client", get_client)
+        yield requests
+
+
+@pytest.mark.asyncio
+async def test_save_dataset_offline(offline_save, mock_context, tmp_path):
+    """A single page is saved to CSV without touching the network."""
+    params = SaveDatasetInput(dataset_id="85313NED", file_name="sample.csv", top=10, translate=False)
+
+    result = await export.cbs_save_dataset(mock_context, params)
+
+    assert "(10 records)" in result
+    df = pd.read_csv(tmp_path / "sample.csv")
+    assert df["ID"].tolist() == list(range(10))
+    assert len(offline_save) == 1
+
+
+@pytest.mark.asyncio
+async def test_save_dataset_offline_cached(offline_save, mock_context):
+    """A second save of the same file is served from the dataset cache."""
+    params = SaveDatasetInput(dataset_id="85313NED", file_name="sample.csv", top=10, translate=False)
+
+    await export.cbs_save_dataset(mock_context, params)
+    result = await export.cbs_save_dataset(mock_context, params)
+
+    assert "(cached)" in result
+    assert len(offline_save) == 1
+
+
+@pytest.mark.asyncio
+async def test_save_dataset_parquet_extension(offline_save, mock_context, tmp_path):
+    """A Parquet save gets a .parquet name and is not served from a cached CSV."""
+    pytest.importorskip("pyarrow")
+
+    csv_params = SaveDatasetInput(dataset_id="85313NED", file_name="sample.csv", top=10, translate=False)
+    parquet_params = csv_params.model_copy(update={"format": export.OutputFormat.PARQUET})
+
+    await export.cbs_save_dataset(mock_context, csv_params)
+    result = await export.cbs_save_dataset(mock_context, parquet_params)
+
+    assert "(cached)" not in result
+    assert pd.read_parquet(tmp_path / "sample.parquet")["ID"].tolist() == list(range(10))
+
+    listing = await analysis.cbs_list_local_datasets(mock_context)
+    assert "sample.csv" in listing and "sample.parquet" in listing
+    assert "~10 rows" in listing.split("sample.parquet")[1]
+
+    code = "result = int(df['Waarde'].sum())"
+    analyze_params = AnalyzeLocalInput(dataset_name="sample.parquet", analysis_code=code)
+    assert await analysis.cbs_analyze_local_dataset(mock_context, analyze_params) == "450"
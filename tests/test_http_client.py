@@ -0,0 +1,76 @@
+"""
+Unit tests for the shared HTTP client helpers.
+"""
+import httpx
+import pytest
+
+from nl_opendata_mcp.services import http_client
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    """Route the shared client through a mock transport that records requests."""
+    requests = []
+
+    def install(handler):
+        def record(request):
+            requests.append(request)
+            return handler(request)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+
+        async def get_client():
+            return client
+
+        monkeypatch.setattr(http_client.HTTPClientManager, "get_client", get_client)
+        return requests
+
+    return install
+
+
+class TestResourceExists:
+    """Tests for resource_exists."""
+
+    @pytest.mark.asyncio
+    async def test_head_success(self, mock_client):
+        """Test an existing resource is detected with a single HEAD request."""
+        requests = mock_client(lambda request: httpx.Response(200))
+
+        assert await http_client.resource_exists("https://example.com/85313NED") is True
+        assert [r.method for r in requests] == ["HEAD"]
+
+    @pytest.mark.asyncio
+    async def test_head_not_found(self, mock_client):
+        """Test a missing resource is reported without a GET fallback."""
+        requests = mock_client(lambda request: httpx.Response(404))
+
+        assert await http_client.resource_exists("https://example.com/UNKNOWN") is False
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_head_not_allowed_falls_back_to_ranged_get(self, mock_client):
+        """Test servers rejecting HEAD are probed with a one-byte ranged GET."""
+        requests = mock_client(
+            lambda request: httpx.Response(405 if request.method == "HEAD" else 206, content=b"{")
+        )
+
+        assert await http_client.resource_exists("https://example.com/85313NED") is True
+        assert [r.method for r in requests] == ["HEAD", "GET"]
+        assert requests[1].headers["Range"] == "bytes=0-0"
+
+
+class TestODataValue:
+    """Tests for odata_value."""
+
+    def test_value_wrapper(self):
+        """Test rows are taken from the OData 'value' array."""
+        response = httpx.Response(200, content=b'{"odata.metadata": "x", "value": [{"ID": 0}]}')
+        assert http_client.odata_value(response) == [{"ID": 0}]
+
+    def test_missing_value(self):
+        """Test a document without 'value' yields no rows."""
+        assert http_client.odata_value(httpx.Response(200, content=b'{}')) == []
+
+    def test_root_array(self):
+        """Test a bare JSON array is returned as-is."""
+        assert http_client.odata_value(httpx.Response(200, content=b'[{"Key": "T001038"}]')) == [{"Key": "T001038"}]
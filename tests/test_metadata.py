@@ -2,107 +2,59 @@
 Tests for dataset metadata tools.
 """
 import pytest
-import json
-import sys
-import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from nl_opendata_mcp import server
 from nl_opendata_mcp.models import (
     DatasetIdInput,
     GetMetadataInput,
+    GetMetadataBulkInput,
     MetadataType,
 )
+from nl_opendata_mcp.utils import json_loads
+from .conftest import get_fn
 
 # Every test in this module makes live HTTP calls to the CBS OData API.
-pytestmark = pytest.mark.live
-
-
-class MockContext:
-    """Mock FastMCP context for testing."""
-    def info(self, msg): print(f"[INFO] {msg}")
-    def error(self, msg): print(f"[ERROR] {msg}")
-    def warning(self, msg): print(f"[WARNING] {msg}")
-
-
-def get_fn(tool):
-    """Extract callable from FunctionTool wrapper."""
-    return tool.fn if hasattr(tool, 'fn') else tool
-
-
-@pytest.fixture
-def ctx():
-    return MockContext()
+pytestmark = [pytest.mark.live, pytest.mark.usefixtures("warm_cache")]
 
 
 TEST_DATASET_ID = "85313NED"
 
 
 @pytest.mark.asyncio
-async def test_unified_metadata_info(ctx):
-    """Test unified metadata tool - info type."""
-    fn = get_fn(server.cbs_get_metadata)
-    params = GetMetadataInput(dataset_id=TEST_DATASET_ID, metadata_type=MetadataType.INFO)
-    result = await fn(ctx, params)
-
-    assert result is not None
-    assert len(result) > 0
-
-
-@pytest.mark.asyncio
-async def test_unified_metadata_structure(ctx):
-    """Test unified metadata tool - structure type."""
-    fn = get_fn(server.cbs_get_metadata)
-    params = GetMetadataInput(dataset_id=TEST_DATASET_ID, metadata_type=MetadataType.STRUCTURE)
-    result = await fn(ctx, params)
-
-    assert result is not None
+@pytest.mark.parametrize("metadata_type,endpoint_name,check", [
+    pytest.param(MetadataType.INFO, None, lambda r: len(r) > 0, id="info"),
     # Should be CSV format with column info
-    assert "Key" in result or "Type" in result or "No metadata" in result
-
-
-@pytest.mark.asyncio
-async def test_unified_metadata_endpoints(ctx):
-    """Test unified metadata tool - endpoints type."""
-    fn = get_fn(server.cbs_get_metadata)
-    params = GetMetadataInput(dataset_id=TEST_DATASET_ID, metadata_type=MetadataType.ENDPOINTS)
-    result = await fn(ctx, params)
-
-    assert result is not None
+    pytest.param(MetadataType.STRUCTURE, None, lambda r: "Key" in r or "Type" in r or "No metadata" in r, id="structure"),
     # Should be JSON
-    try:
-        data = json.loads(result)
-        assert isinstance(data, dict)
-    except json.JSONDecodeError:
-        pytest.fail("Expected JSON output for endpoints")
-
-
-@pytest.mark.asyncio
-async def test_unified_metadata_dimensions(ctx):
-    """Test unified metadata tool - dimensions type."""
+    pytest.param(MetadataType.ENDPOINTS, None, lambda r: isinstance(json_loads(r), dict), id="endpoints"),
+    # Should contain dimension info with codes
+    pytest.param(
+        MetadataType.DIMENSIONS, "Geslacht",
+        lambda r: "DIMENSION" in r or "Code" in r or "not found" in r.lower(),
+        id="dimensions"
+    ),
+    pytest.param(MetadataType.CUSTOM, "DataProperties", lambda r: len(r) > 0, id="custom"),
+])
+async def test_unified_metadata(ctx, metadata_type, endpoint_name, check):
+    """Test unified metadata tool - each metadata type returns its expected output."""
     fn = get_fn(server.cbs_get_metadata)
     params = GetMetadataInput(
         dataset_id=TEST_DATASET_ID,
-        metadata_type=MetadataType.DIMENSIONS,
-        endpoint_name="Geslacht"
+        metadata_type=metadata_type,
+        endpoint_name=endpoint_name
     )
     result = await fn(ctx, params)
 
     assert result is not None
-    # Should contain dimension info with codes
-    assert "DIMENSION" in result or "Code" in result or "not found" in result.lower()
+    assert check(result)
 
 
 @pytest.mark.asyncio
-async def test_unified_metadata_dimensions_missing_endpoint(ctx):
-    """Test unified metadata tool - dimensions without endpoint_name."""
+@pytest.mark.parametrize("metadata_type", [MetadataType.DIMENSIONS, MetadataType.CUSTOM])
+async def test_unified_metadata_missing_endpoint(ctx, metadata_type):
+    """Test unified metadata tool - types that need endpoint_name reject a call without it."""
     fn = get_fn(server.cbs_get_metadata)
-    params = GetMetadataInput(
-        dataset_id=TEST_DATASET_ID,
-        metadata_type=MetadataType.DIMENSIONS
-    )
+    params = GetMetadataInput(dataset_id=TEST_DATASET_ID, metadata_type=metadata_type)
     result = await fn(ctx, params)
 
     assert "error" in result.lower()
@@ -110,28 +62,26 @@ async def test_unified_metadata_dimensions_missing_endpoint(ctx):
 
 
 @pytest.mark.asyncio
-async def test_unified_metadata_custom(ctx):
-    """Test unified metadata tool - custom endpoint."""
-    fn = get_fn(server.cbs_get_metadata)
-    params = GetMetadataInput(
+async def test_metadata_bulk(ctx):
+    """Test bulk metadata tool - info, structure and a dimension in one call."""
+    fn = get_fn(server.cbs_get_metadata_bulk)
+    params = GetMetadataBulkInput(
         dataset_id=TEST_DATASET_ID,
-        metadata_type=MetadataType.CUSTOM,
-        endpoint_name="DataProperties"
+        metadata_types=[MetadataType.INFO, MetadataType.STRUCTURE],
+        dimensions=["Geslacht"]
     )
     result = await fn(ctx, params)
 
-    assert result is not None
+    assert "=== INFO ===" in result
+    assert "=== STRUCTURE ===" in result
+    assert "=== DIMENSION Geslacht ===" in result
 
 
 @pytest.mark.asyncio
-async def test_unified_metadata_custom_missing_endpoint(ctx):
-    """Test unified metadata tool - custom without endpoint_name."""
-    fn = get_fn(server.cbs_get_metadata)
-    params = GetMetadataInput(
-        dataset_id=TEST_DATASET_ID,
-        metadata_type=MetadataType.CUSTOM
-    )
+async def test_metadata_bulk_rejects_custom(ctx):
+    """Test bulk metadata tool - custom type is not supported."""
+    fn = get_fn(server.cbs_get_metadata_bulk)
+    params = GetMetadataBulkInput(dataset_id=TEST_DATASET_ID, metadata_types=[MetadataType.CUSTOM])
     result = await fn(ctx, params)
 
-    assert "error" in result.lower()
-    assert "endpoint_name" in result.lower()
+    assert "Error" in result
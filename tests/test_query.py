@@ -2,37 +2,16 @@
 Tests for dataset query and inspection tools.
 """
 import pytest
-import sys
-import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from nl_opendata_mcp import server
 from nl_opendata_mcp.models import (
     DatasetIdInput,
     QueryDatasetInput,
 )
+from .conftest import get_fn
 
 # Every test in this module makes live HTTP calls to the CBS OData API.
-pytestmark = pytest.mark.live
-
-
-class MockContext:
-    """Mock FastMCP context for testing."""
-    def info(self, msg): print(f"[INFO] {msg}")
-    def error(self, msg): print(f"[ERROR] {msg}")
-    def warning(self, msg): print(f"[WARNING] {msg}")
-
-
-def get_fn(tool):
-    """Extract callable from FunctionTool wrapper."""
-    return tool.fn if hasattr(tool, 'fn') else tool
-
-
-@pytest.fixture
-def ctx():
-    return MockContext()
+pytestmark = [pytest.mark.live, pytest.mark.usefixtures("warm_cache")]
 
 
 TEST_DATASET_ID = "85313NED"
@@ -67,17 +46,11 @@ async def test_query_dataset_with_skip(ctx):
     """Test dataset query with pagination."""
     fn = get_fn(server.cbs_query_dataset)
 
-    # First query
-    params1 = QueryDatasetInput(dataset_id=TEST_DATASET_ID, top=3, skip=0)
-    result1 = await fn(ctx, params1)
-
-    # Second query with skip
-    params2 = QueryDatasetInput(dataset_id=TEST_DATASET_ID, top=3, skip=3)
-    result2 = await fn(ctx, params2)
+    # The first page (skip=0) is already fetched by test_query_dataset_basic
+    params = QueryDatasetInput(dataset_id=TEST_DATASET_ID, top=3, skip=3)
+    result = await fn(ctx, params)
 
-    # Results should be different (unless dataset is very small)
-    assert result1 is not None
-    assert result2 is not None
+    assert result is not None
 
 
 @pytest.mark.asyncio
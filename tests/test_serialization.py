@@ -0,0 +1,46 @@
+"""
+Tests for JSON and CSV serialization helpers.
+"""
+import json
+
+from nl_opendata_mcp.utils import json_loads, json_dumps, records_to_csv
+
+
+class TestJson:
+    """Tests for orjson-backed JSON helpers."""
+
+    def test_loads_bytes(self):
+        """Test parsing a response body."""
+        assert json_loads(b'{"value": [{"Key": "1100"}]}') == {"value": [{"Key": "1100"}]}
+
+    def test_dumps_round_trip(self):
+        """Test indented output keeps key order and non-ASCII text."""
+        data = {"Title": "Bevolking; geslacht", "Regio": "Súdwest-Fryslân"}
+        result = json_dumps(data)
+
+        assert json.loads(result) == data
+        assert list(json.loads(result)) == ["Title", "Regio"]
+        assert "Súdwest-Fryslân" in result
+        assert '\n  "Title"' in result
+
+
+class TestRecordsToCsv:
+    """Tests for records_to_csv."""
+
+    def test_basic_records(self):
+        """Test header and rows, with quoting where needed."""
+        result = records_to_csv([{"Key": "1", "Title": "Mannen, totaal"}, {"Key": "2", "Title": "Vrouwen"}])
+
+        assert result == 'Key,Title\n1,"Mannen, totaal"\n2,Vrouwen\n'
+
+    def test_heterogeneous_records(self):
+        """Test union of keys in first-seen order and empty fields for missing values."""
+        result = records_to_csv([{"a": 1, "b": None}, {"a": 2, "c": 3}])
+
+        assert result == "a,b,c\n1,,\n2,,3\n"
+
+    def test_same_keys_in_different_order(self):
+        """Test rows whose keys are ordered differently still line up with the header."""
+        result = records_to_csv([{"a": 1, "b": 2}, {"b": 4, "a": 3}])
+
+        assert result == "a,b\n1,2\n3,4\n"
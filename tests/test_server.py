@@ -6,6 +6,8 @@ Updated to work with async tools and Pydantic input models.
 import asyncio
 import json
 import os
+import tempfile
+from pathlib import Path
 import pytest
 
 # Import the server module to access tools and input models
@@ -21,146 +23,108 @@ from nl_opendata_mcp.models import (
     GetMetadataInput,
     MetadataType,
 )
-from nl_opendata_mcp.config import get_settings
-from nl_opendata_mcp.services.cache import catalog_cache, dataset_cache
+from nl_opendata_mcp.services.cache import catalog_cache
+from .conftest import MockContext, get_fn
 
 # Every test in this module makes live HTTP calls to the CBS OData API.
-pytestmark = pytest.mark.live
+pytestmark = [pytest.mark.live, pytest.mark.usefixtures("warm_cache")]
+
+# Progress output for the manual runner; set TEST_VERBOSE=1 to see it
+log = print if os.environ.get("TEST_VERBOSE") else (lambda *args: None)
 
 # Base URL for direct API testing
 DATA_BASE_URL = "https://opendata.cbs.nl/ODataFeed/OData"
 
 
-class MockContext:
-    """Mock context for testing FastMCP tools"""
-    def info(self, msg):
-        print(f"[INFO] {msg}")
-    def error(self, msg):
-        print(f"[ERROR] {msg}")
-    def warning(self, msg):
-        print(f"[WARNING] {msg}")
-
-
-ctx = MockContext()
-
-
-def get_fn(tool):
-    """Extract the callable function from a FunctionTool wrapper"""
-    if hasattr(tool, 'fn'):
-        return tool.fn
-    return tool
-
-
-async def test_list_datasets():
-    print("Testing cbs_list_datasets...")
+async def test_list_datasets(ctx):
+    log("Testing cbs_list_datasets...")
     fn = get_fn(server.cbs_list_datasets)
     params = ListDatasetsInput(top=2)
     result = await fn(ctx, params)
-    print("Success! Result length:", len(result))
-    print("Preview:", result[:100].replace('\n', ' '))
+    log("Success! Result length:", len(result))
+    log("Preview:", result[:100].replace('\n', ' '))
 
 
-async def test_search_datasets():
-    print("\nTesting cbs_search_datasets...")
+async def test_search_datasets(ctx):
+    log("\nTesting cbs_search_datasets...")
     fn = get_fn(server.cbs_search_datasets)
     params = SearchDatasetsInput(query="Bevolking", top=2)
     result = await fn(ctx, params)
-    print(f"Success! Result length:", len(result))
-    print("Preview:", result[:100].replace('\n', ' '))
+    log(f"Success! Result length:", len(result))
+    log("Preview:", result[:100].replace('\n', ' '))
 
 
-async def test_search_datasets_with_field():
-    print("\nTesting cbs_search_datasets with search_field parameter...")
+async def test_search_datasets_with_field(ctx):
+    log("\nTesting cbs_search_datasets with search_field parameter...")
     fn = get_fn(server.cbs_search_datasets)
     params = SearchDatasetsInput(query="Bevolking", top=2, search_field=SearchField.SUMMARY)
     result = await fn(ctx, params)
-    print(f"Success! Result length:", len(result))
-    print("Preview:", result[:100].replace('\n', ' '))
+    log(f"Success! Result length:", len(result))
+    log("Preview:", result[:100].replace('\n', ' '))
 
 
-async def test_estimate_dataset_size():
-    print("\nTesting cbs_estimate_dataset_size...")
+async def test_estimate_dataset_size(ctx):
+    log("\nTesting cbs_estimate_dataset_size...")
     fn = get_fn(server.cbs_estimate_dataset_size)
     params = DatasetIdInput(dataset_id="85313NED")
     result = await fn(ctx, params)
-    print("Success! Result:")
-    print(result)
+    log("Success! Result:")
+    log(result)
 
 
-async def test_get_metadata():
-    print("\nTesting cbs_get_metadata (unified)...")
+async def test_get_metadata(ctx):
+    log("\nTesting cbs_get_metadata (unified)...")
     fn = get_fn(server.cbs_get_metadata)
     params = GetMetadataInput(dataset_id="85313NED", metadata_type=MetadataType.INFO)
     result = await fn(ctx, params)
-    print("Success! Result length:", len(result))
-    print("Preview:", result[:100].replace('\n', ' '))
+    log("Success! Result length:", len(result))
+    log("Preview:", result[:100].replace('\n', ' '))
 
 
-async def test_save_dataset():
-    print("\nTesting cbs_save_dataset...")
+async def test_save_dataset(ctx, downloads):
+    log("\nTesting cbs_save_dataset...")
     fn = get_fn(server.cbs_save_dataset)
-    path = "test_dataset.csv"
-    params = SaveDatasetInput(dataset_id="85313NED", file_name=path, top=50)
+    params = SaveDatasetInput(dataset_id="85313NED", file_name="test_dataset.csv", top=50)
     result = await fn(ctx, params)
-    print("Success!", result)
-    full_path = os.path.join(server.settings.downloads_path, path)
-    if os.path.exists(full_path):
-        os.remove(full_path)
-        print("Cleaned up test file")
+    log("Success!", result)
 
 
-async def test_save_dataset_cache():
-    print("\nTesting cbs_save_dataset caching...")
+async def test_save_dataset_cache(ctx, downloads):
+    log("\nTesting cbs_save_dataset caching...")
     fn = get_fn(server.cbs_save_dataset)
-    settings = get_settings()
-    path = "test_cache_dataset.csv"
-
-    # Ensure clean state
-    full_path = os.path.abspath(os.path.join(settings.downloads_path, path))
-    if os.path.exists(full_path):
-        os.remove(full_path)
-
-    # Clear cache entry if exists
-    dataset_cache.remove(full_path)
 
     # First Call - Should download
-    print("  1. First save (should download)...")
-    params = SaveDatasetInput(dataset_id="85313NED", file_name=path, top=10)
+    log("  1. First save (should download)...")
+    params = SaveDatasetInput(dataset_id="85313NED", file_name="test_cache_dataset.csv", top=10)
     result1 = await fn(ctx, params)
-    print("  Result 1:", result1)
+    log("  Result 1:", result1)
 
     if "cached" in result1:
-        print("  [FAIL] First call should not be cached!")
+        log("  [FAIL] First call should not be cached!")
     else:
-        print("  [PASS] First call downloaded.")
+        log("  [PASS] First call downloaded.")
 
     # Second Call - Should be cached
-    print("  2. Second save (should cache)...")
+    log("  2. Second save (should cache)...")
     result2 = await fn(ctx, params)
-    print("  Result 2:", result2)
+    log("  Result 2:", result2)
 
     if "cached" in result2:
-        print("  [PASS] Second call was cached.")
+        log("  [PASS] Second call was cached.")
     else:
-        print("  [FAIL] Second call was NOT cached!")
+        log("  [FAIL] Second call was NOT cached!")
 
-    # Clean up
-    if os.path.exists(full_path):
-        os.remove(full_path)
-    dataset_cache.remove(full_path)
-    print("  Cleaned up test file and cache")
 
-
-async def test_query_dataset():
-    print("\nTesting cbs_query_dataset...")
+async def test_query_dataset(ctx):
+    log("\nTesting cbs_query_dataset...")
     fn = get_fn(server.cbs_query_dataset)
     params = QueryDatasetInput(dataset_id="85313NED", top=2)
     result = await fn(ctx, params)
-    print("Success!", result[:200] if len(result) > 200 else result)
+    log("Success!", result[:200] if len(result) > 200 else result)
 
 
-async def test_analyze_dataset():
-    print("\nTesting cbs_analyze_remote_dataset...")
+async def test_analyze_dataset(ctx):
+    log("\nTesting cbs_analyze_remote_dataset...")
     fn = get_fn(server.cbs_analyze_remote_dataset)
     code = """
 print(f"Row count: {len(df)}")
@@ -169,46 +133,62 @@ result = df.describe().to_string()
 """
     params = AnalyzeRemoteInput(dataset_id="85313NED", analysis_code=code)
     result = await fn(ctx, params)
-    print("Analysis Result:")
-    print(result[:500] + "..." if len(result) > 500 else result)
+    log("Analysis Result:")
+    log(result[:500] + "..." if len(result) > 500 else result)
 
 
 def test_generate_odata_filter():
-    print("\nTesting generate_odata_filter prompt...")
+    log("\nTesting generate_odata_filter prompt...")
     fn = get_fn(server.generate_odata_filter)
     table_structure = '{"columns": [{"name": "Age", "type": "int"}, {"name": "Population", "type": "int"}]}'
     user_query = "Population in 2023"
     prompt = fn(table_structure, user_query)
-    print("Generated Prompt Preview:")
-    print(prompt[:200] + "...")
+    log("Generated Prompt Preview:")
+    log(prompt[:200] + "...")
 
 
 async def run_all_tests():
-    print("=" * 60)
-    print("RUNNING ALL TESTS")
-    print("=" * 60)
-
-    # Core functionality tests
-    await test_list_datasets()
-    await test_search_datasets()
-
-    print("\n--- Re-running search to test cache ---")
-    await test_search_datasets()
-
-    await test_search_datasets_with_field()
-    await test_estimate_dataset_size()
-    await test_get_metadata()
-    await test_query_dataset()
-    await test_analyze_dataset()
-    test_generate_odata_filter()
+    ctx = MockContext()
+    log("=" * 60)
+    log("RUNNING ALL TESTS")
+    log("=" * 60)
+
+    # Core functionality tests are independent reads, so they run concurrently
+    # over the shared client instead of one after another
+    await asyncio.gather(
+        test_list_datasets(ctx),
+        test_search_datasets(ctx),
+        test_search_datasets_with_field(ctx),
+        test_estimate_dataset_size(ctx),
+        test_get_metadata(ctx),
+        test_query_dataset(ctx),
+        test_analyze_dataset(ctx),
+    )
+
+    log("\n--- Re-running search to test cache ---")
+    await test_search_datasets(ctx)
 
-    # New tests for save functionality
-    await test_save_dataset()
-    await test_save_dataset_cache()
+    test_generate_odata_filter()
 
-    print("\n" + "=" * 60)
-    print("ALL TESTS COMPLETED")
-    print("=" * 60)
+    # New tests for save functionality, writing to a throwaway downloads
+    # directory and dataset cache like the pytest `downloads` fixture
+    from nl_opendata_mcp.services.cache import DatasetCache
+    from nl_opendata_mcp.tools import export
+
+    saved = export.settings.downloads_path, export.dataset_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        downloads = Path(tmp)
+        export.settings.downloads_path = tmp
+        export.dataset_cache = DatasetCache(cache_file=str(downloads / "dataset_cache.json"))
+        try:
+            await test_save_dataset(ctx, downloads)
+            await test_save_dataset_cache(ctx, downloads)
+        finally:
+            export.settings.downloads_path, export.dataset_cache = saved
+
+    log("\n" + "=" * 60)
+    log("ALL TESTS COMPLETED")
+    log("=" * 60)
 
 
 if __name__ == "__main__":
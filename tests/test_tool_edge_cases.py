@@ -1,40 +1,42 @@
 """
 Tests for tool edge cases and error handling.
 """
+import re
+
 import pytest
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nl_opendata_mcp.models import (
+    DatasetIdInput,
+    GetMetadataInput,
+    MetadataType,
+    QueryDatasetInput,
+    SearchDatasetsInput,
+)
+from nl_opendata_mcp.tools.discovery import cbs_check_dataset_availability, cbs_search_datasets
+from nl_opendata_mcp.tools.metadata import cbs_get_metadata
+from nl_opendata_mcp.tools.query import cbs_estimate_dataset_size, cbs_inspect_dataset_details, cbs_query_dataset
 
 # Every test in this module makes live HTTP calls to the CBS OData API.
-pytestmark = pytest.mark.live
-
-
-class MockContext:
-    """Mock FastMCP context for testing."""
-
-    def __init__(self):
-        self.messages = []
-
-    def info(self, msg):
-        self.messages.append(('info', msg))
+pytestmark = [pytest.mark.live, pytest.mark.usefixtures("warm_cache")]
 
-    def error(self, msg):
-        self.messages.append(('error', msg))
+# Tool inputs are not mutated by the tools, so the shared one is built once
+DATASET_PARAMS = DatasetIdInput(dataset_id="83765NED")
 
-    def warning(self, msg):
-        self.messages.append(('warning', msg))
+# Tokens the assertions look for, matched case-insensitively in one pass over
+# the result instead of on a lowercased copy of it
+ERR_TOKENS = re.compile(r"not found|error", re.IGNORECASE)
+FAILURE_TOKENS = re.compile(r"not found|error|failed", re.IGNORECASE)
+STRUCT_TOKENS = re.compile(r"DIMENSIONS|MEASURES|TITLE", re.IGNORECASE)
+SIZE_TOKENS = re.compile(r"row|record|estimated", re.IGNORECASE)
+SOURCE_TOKENS = re.compile(r"cbs|available|odata", re.IGNORECASE)
+ROWS_2 = re.compile(r"Rows:\s*2", re.IGNORECASE)
 
 
+@pytest.mark.slow
 class TestSearchEdgeCases:
     @pytest.mark.asyncio
-    async def test_search_with_special_characters(self):
+    async def test_search_with_special_characters(self, ctx):
         """Search should handle quotes and special chars in query."""
-        from nl_opendata_mcp.tools.discovery import cbs_search_datasets
-        from nl_opendata_mcp.models import SearchDatasetsInput
-
-        ctx = MockContext()
         result = await cbs_search_datasets(
             ctx,
             SearchDatasetsInput(query="test's \"value\"", top=5)
@@ -44,12 +46,8 @@ class TestSearchEdgeCases:
         assert result is not None
 
     @pytest.mark.asyncio
-    async def test_search_with_unicode(self):
+    async def test_search_with_unicode(self, ctx):
         """Search should handle unicode characters."""
-        from nl_opendata_mcp.tools.discovery import cbs_search_datasets
-        from nl_opendata_mcp.models import SearchDatasetsInput
-
-        ctx = MockContext()
         result = await cbs_search_datasets(
             ctx,
             SearchDatasetsInput(query="café München", top=5)
@@ -58,12 +56,9 @@ class TestSearchEdgeCases:
         assert result is not None
 
     @pytest.mark.asyncio
-    async def test_search_very_long_query(self):
+    async def test_search_very_long_query(self, ctx):
         """Search should handle or reject very long queries gracefully."""
-        from nl_opendata_mcp.tools.discovery import cbs_search_datasets
-        from nl_opendata_mcp.models import SearchDatasetsInput
 
-        ctx = MockContext()
         long_query = "bevolking " * 100  # Very long query
 
         result = await cbs_search_datasets(
@@ -77,28 +72,19 @@ class TestSearchEdgeCases:
 
 class TestQueryEdgeCases:
     @pytest.mark.asyncio
-    async def test_query_nonexistent_dataset(self):
+    async def test_query_nonexistent_dataset(self, ctx):
         """Should return helpful error for invalid dataset."""
-        from nl_opendata_mcp.tools.query import cbs_query_dataset
-        from nl_opendata_mcp.models import QueryDatasetInput
-
-        ctx = MockContext()
         result = await cbs_query_dataset(
             ctx,
             QueryDatasetInput(dataset_id="NONEXISTENT99999XYZ", top=5)
         )
 
         # Should indicate error/not found
-        result_lower = result.lower()
-        assert "not found" in result_lower or "error" in result_lower or "failed" in result_lower
+        assert FAILURE_TOKENS.search(result)
 
     @pytest.mark.asyncio
-    async def test_query_returns_data(self):
+    async def test_query_returns_data(self, ctx):
         """Query results should contain data."""
-        from nl_opendata_mcp.tools.query import cbs_query_dataset
-        from nl_opendata_mcp.models import QueryDatasetInput
-
-        ctx = MockContext()
         result = await cbs_query_dataset(
             ctx,
             QueryDatasetInput(dataset_id="83765NED", top=3)
@@ -108,15 +94,12 @@ class TestQueryEdgeCases:
         assert result is not None
         assert len(result) > 50  # Should have meaningful content
         # Should have multiple lines (header + data)
-        assert result.count('\n') >= 1
+        assert '\n' in result
 
     @pytest.mark.asyncio
-    async def test_query_with_filter(self):
+    async def test_query_with_filter(self, ctx):
         """Query with filter should work or return empty result."""
-        from nl_opendata_mcp.tools.query import cbs_query_dataset
-        from nl_opendata_mcp.models import QueryDatasetInput
 
-        ctx = MockContext()
         # Use a filter that might match something in this geo dataset
         result = await cbs_query_dataset(
             ctx,
@@ -131,12 +114,8 @@ class TestQueryEdgeCases:
         assert result is not None
 
     @pytest.mark.asyncio
-    async def test_query_respects_top_limit(self):
+    async def test_query_respects_top_limit(self, ctx):
         """Query should respect the top parameter."""
-        from nl_opendata_mcp.tools.query import cbs_query_dataset
-        from nl_opendata_mcp.models import QueryDatasetInput
-
-        ctx = MockContext()
         result = await cbs_query_dataset(
             ctx,
             QueryDatasetInput(dataset_id="83765NED", top=2)
@@ -144,65 +123,48 @@ class TestQueryEdgeCases:
 
         # Result includes metadata header like "QUERY RESULT: ...\nRows: 2, ..."
         # Check that "Rows: 2" is mentioned in the output
-        assert "Rows: 2" in result or "rows: 2" in result.lower()
+        assert ROWS_2.search(result)
 
 
 class TestInspectEdgeCases:
     @pytest.mark.asyncio
-    async def test_inspect_includes_key_sections(self):
+    async def test_inspect_includes_key_sections(self, ctx):
         """Inspect should return metadata and structure info."""
-        from nl_opendata_mcp.tools.query import cbs_inspect_dataset_details
-        from nl_opendata_mcp.models import DatasetIdInput
-
-        ctx = MockContext()
         result = await cbs_inspect_dataset_details(
             ctx,
-            DatasetIdInput(dataset_id="83765NED")
+            DATASET_PARAMS
         )
 
-        result_upper = result.upper()
         # Should have some structural info (dimensions, measures, or title)
-        assert "DIMENSIONS" in result_upper or "MEASURES" in result_upper or "TITLE" in result_upper
+        assert STRUCT_TOKENS.search(result)
 
     @pytest.mark.asyncio
-    async def test_inspect_nonexistent_dataset(self):
+    async def test_inspect_nonexistent_dataset(self, ctx):
         """Inspect of invalid dataset should return error message."""
-        from nl_opendata_mcp.tools.query import cbs_inspect_dataset_details
-        from nl_opendata_mcp.models import DatasetIdInput
-
-        ctx = MockContext()
         result = await cbs_inspect_dataset_details(
             ctx,
             DatasetIdInput(dataset_id="INVALID_DATASET_XYZ123")
         )
 
-        result_lower = result.lower()
-        assert "not found" in result_lower or "error" in result_lower
+        assert ERR_TOKENS.search(result)
 
 
 class TestMetadataEdgeCases:
     @pytest.mark.asyncio
-    async def test_get_metadata_for_valid_dataset(self):
+    async def test_get_metadata_for_valid_dataset(self, ctx):
         """Should return metadata for valid dataset using unified tool."""
-        from nl_opendata_mcp.tools.metadata import cbs_get_metadata
-        from nl_opendata_mcp.models import GetMetadataInput, MetadataType
-
-        ctx = MockContext()
         result = await cbs_get_metadata(
             ctx,
             GetMetadataInput(dataset_id="83765NED", metadata_type=MetadataType.INFO)
         )
 
         # Should contain dataset info
-        assert "83765NED" in result or "Title" in result or "title" in result.lower()
+        assert "83765NED" in result or re.search("title", result, re.IGNORECASE)
 
     @pytest.mark.asyncio
-    async def test_query_metadata_endpoint(self):
+    async def test_query_metadata_endpoint(self, ctx):
         """Should query specific metadata endpoints using unified tool."""
-        from nl_opendata_mcp.tools.metadata import cbs_get_metadata
-        from nl_opendata_mcp.models import GetMetadataInput, MetadataType
 
-        ctx = MockContext()
         # Use WijkenEnBuurten which exists in 83765NED via custom endpoint
         result = await cbs_get_metadata(
             ctx,
@@ -213,67 +175,48 @@ class TestMetadataEdgeCases:
         assert "Key" in result or "Title" in result or "GM" in result
 
     @pytest.mark.asyncio
-    async def test_query_nonexistent_metadata_endpoint(self):
+    async def test_query_nonexistent_metadata_endpoint(self, ctx):
         """Should handle nonexistent metadata endpoint gracefully."""
-        from nl_opendata_mcp.tools.metadata import cbs_get_metadata
-        from nl_opendata_mcp.models import GetMetadataInput, MetadataType
-
-        ctx = MockContext()
         result = await cbs_get_metadata(
             ctx,
             GetMetadataInput(dataset_id="83765NED", metadata_type=MetadataType.CUSTOM, endpoint_name="NonExistentEndpoint")
         )
 
         # Should return error message, not crash
-        result_lower = result.lower()
-        assert "error" in result_lower or "not found" in result_lower
+        assert ERR_TOKENS.search(result)
 
 
 class TestEstimateSizeEdgeCases:
     @pytest.mark.asyncio
-    async def test_estimate_returns_numeric_info(self):
+    async def test_estimate_returns_numeric_info(self, ctx):
         """Size estimate should include row/column counts."""
-        from nl_opendata_mcp.tools.query import cbs_estimate_dataset_size
-        from nl_opendata_mcp.models import DatasetIdInput
-
-        ctx = MockContext()
         result = await cbs_estimate_dataset_size(
             ctx,
-            DatasetIdInput(dataset_id="83765NED")
+            DATASET_PARAMS
         )
 
         # Should mention rows or records
-        result_lower = result.lower()
-        assert "row" in result_lower or "record" in result_lower or "estimated" in result_lower
+        assert SIZE_TOKENS.search(result)
 
 
 class TestAvailabilityEdgeCases:
     @pytest.mark.asyncio
-    async def test_check_cbs_dataset(self):
+    async def test_check_cbs_dataset(self, ctx):
         """Should confirm CBS dataset is available."""
-        from nl_opendata_mcp.tools.discovery import cbs_check_dataset_availability
-        from nl_opendata_mcp.models import DatasetIdInput
-
-        ctx = MockContext()
         result = await cbs_check_dataset_availability(
             ctx,
-            DatasetIdInput(dataset_id="83765NED")
+            DATASET_PARAMS
         )
 
-        result_lower = result.lower()
-        assert "cbs" in result_lower or "available" in result_lower or "odata" in result_lower
+        assert SOURCE_TOKENS.search(result)
 
     @pytest.mark.asyncio
-    async def test_check_invalid_dataset(self):
+    async def test_check_invalid_dataset(self, ctx):
         """Should indicate dataset not found."""
-        from nl_opendata_mcp.tools.discovery import cbs_check_dataset_availability
-        from nl_opendata_mcp.models import DatasetIdInput
-
-        ctx = MockContext()
         result = await cbs_check_dataset_availability(
             ctx,
             DatasetIdInput(dataset_id="TOTALLY_FAKE_12345")
         )
 
-        result_lower = result.lower()
-        assert "not found" in result_lower or "not" in result_lower
+        # "not" also covers "not found"
+        assert re.search("not", result, re.IGNORECASE)
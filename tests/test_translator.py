@@ -1,21 +1,32 @@
 """
 Tests for dimension translator service.
 """
+import asyncio
+
 from nl_opendata_mcp import server
 import pytest
 import pandas as pd
 from unittest.mock import patch, AsyncMock
 
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from nl_opendata_mcp.services.translator import (
     DimensionCache,
     DimensionTranslator,
 )
 
 
+@pytest.fixture(scope="module")
+def shared_translator():
+    """One translator, with its own cache, for the whole module."""
+    return DimensionTranslator(DimensionCache(ttl_seconds=3600))
+
+
+@pytest.fixture
+def translator(shared_translator):
+    """The shared translator, with its cache emptied for each test."""
+    shared_translator._cache.clear()
+    return shared_translator
+
+
 class TestDimensionCache:
     @pytest.mark.asyncio
     async def test_caches_mapping_on_second_call(self):
@@ -50,6 +61,9 @@ class TestDimensionCache:
             # Should find with or without spaces
             assert mapping.get("1100") == "Mannen"
             assert mapping.get("1100   ") == "Mannen"
+            assert "1100   " in mapping
+            # ...while storing the key only once
+            assert list(mapping) == ["1100"]
 
     @pytest.mark.asyncio
     async def test_handles_api_failure_gracefully(self):
@@ -63,6 +77,26 @@ class TestDimensionCache:
 
             assert mapping == {}
 
+    @pytest.mark.asyncio
+    async def test_retries_after_api_failure(self):
+        """A failed fetch should not be cached: the next call fetches again."""
+        cache = DimensionCache(ttl_seconds=3600)
+
+        with patch('nl_opendata_mcp.services.translator.fetch_json', new_callable=AsyncMock) as mock:
+            mock.side_effect = [
+                Exception("API error"),
+                {"value": [{"Key": "1100", "Title": "Mannen"}]},
+                Exception("API error"),
+                {"value": [{"name": "Geslacht"}]},
+            ]
+
+            assert await cache.get_mapping("test", "dim") == {}
+            assert await cache.get_mapping("test", "dim") == {"1100": "Mannen"}
+            assert await cache.get_dimensions("test") == []
+            assert await cache.get_dimensions("test") == ["Geslacht"]
+
+            assert mock.call_count == 4
+
     @pytest.mark.asyncio
     async def test_different_datasets_cached_separately(self):
         """Each dataset/dimension combo should have its own cache entry."""
@@ -76,6 +110,62 @@ class TestDimensionCache:
 
             assert mock.call_count == 2  # Different datasets, both fetched
 
+    @pytest.mark.asyncio
+    async def test_fetches_dimensions_concurrently(self):
+        """Different dimensions should be fetched in parallel, the same one only once."""
+        cache = DimensionCache(ttl_seconds=3600)
+        in_flight = []
+        peak = 0
+
+        async def fake_fetch(url, default=None):
+            nonlocal peak
+            in_flight.append(url)
+            peak = max(peak, len(in_flight))
+            await asyncio.sleep(0)
+            in_flight.remove(url)
+            return {"value": [{"Key": "1", "Title": "Test"}]}
+
+        with patch('nl_opendata_mcp.services.translator.fetch_json', side_effect=fake_fetch) as mock:
+            await asyncio.gather(
+                cache.get_mapping("83765NED", "Geslacht"),
+                cache.get_mapping("83765NED", "RegioS"),
+                cache.get_mapping("83765NED", "Geslacht"),
+            )
+
+        assert peak == 2
+        assert mock.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        """A full cache should drop the mapping used longest ago."""
+        cache = DimensionCache(ttl_seconds=3600, max_entries=2)
+
+        with patch('nl_opendata_mcp.services.translator.fetch_json', new_callable=AsyncMock) as mock:
+            mock.return_value = {"value": [{"Key": "1", "Title": "Test"}]}
+
+            await cache.get_mapping("83765NED", "Geslacht")
+            await cache.get_mapping("83765NED", "RegioS")
+            await cache.get_mapping("83765NED", "Geslacht")  # Hit: RegioS is now oldest
+            await cache.get_mapping("83765NED", "Perioden")
+            await cache.get_mapping("83765NED", "Geslacht")
+
+            assert mock.call_count == 3
+            stats = cache.get_stats()
+            assert stats["total_entries"] == 2
+            assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1)
+
+    @pytest.mark.asyncio
+    async def test_caches_dimension_names(self, translator):
+        """A dataset's dimension endpoints should be fetched once and reused."""
+        with patch('nl_opendata_mcp.services.translator.fetch_json', new_callable=AsyncMock) as mock:
+            mock.return_value = {"value": [{"name": "Geslacht"}, {"name": "TypedDataSet"}, {"name": "RegioS"}]}
+
+            first = await translator.get_available_dimensions("83765NED")
+            second = await translator.get_available_dimensions("83765NED")
+
+            assert first == second == ["Geslacht", "RegioS"]
+            assert mock.call_count == 1
+
     def test_cache_stats(self):
         """Stats should report cache state."""
         cache = DimensionCache(ttl_seconds=3600)
@@ -86,71 +176,71 @@ class TestDimensionCache:
         assert "ttl_seconds" in stats
         assert stats["ttl_seconds"] == 3600
 
+    @pytest.mark.asyncio
+    async def test_clear_resets_stats(self):
+        """Stats should be a snapshot, and clear() should reset the counters."""
+        cache = DimensionCache(ttl_seconds=3600)
+
+        with patch('nl_opendata_mcp.services.translator.fetch_json', new_callable=AsyncMock) as mock:
+            mock.return_value = {"value": [{"Key": "1", "Title": "Test"}]}
+            await cache.get_mapping("83765NED", "Geslacht")
+            await cache.get_mapping("83765NED", "Geslacht")
+
+        before = cache.get_stats()
+        cache.clear()
+
+        assert (before["hits"], before["misses"], before["total_entries"]) == (1, 1, 1)
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"], stats["total_entries"]) == (0, 0, 0, 0)
+
 
 class TestDimensionTranslator:
     @pytest.mark.asyncio
-    async def test_translates_dimension_values(self):
+    async def test_translates_dimension_values(self, translator, monkeypatch):
         """Should replace coded values with titles."""
-        translator = DimensionTranslator()
-
         df = pd.DataFrame({
             "Geslacht": ["1100", "1200"],
             "Value": [100, 200],
         })
+        monkeypatch.setattr(translator._cache, "get_mapping", AsyncMock(return_value={"1100": "Mannen", "1200": "Vrouwen"}))
+        monkeypatch.setattr(translator, "get_available_dimensions", AsyncMock(return_value=["Geslacht"]))
 
-        with patch.object(translator._cache, 'get_mapping', new_callable=AsyncMock) as cache_mock:
-            cache_mock.return_value = {"1100": "Mannen", "1200": "Vrouwen"}
-
-            with patch.object(translator, 'get_available_dimensions', new_callable=AsyncMock) as dims_mock:
-                dims_mock.return_value = ["Geslacht"]
-
-                result = await translator.translate_dataframe(df, "test")
+        result = await translator.translate_dataframe(df, "test")
 
-                assert result["Geslacht"].tolist() == ["Mannen", "Vrouwen"]
-                assert result["Value"].tolist() == [100, 200]  # Unchanged
+        assert result["Geslacht"].tolist() == ["Mannen", "Vrouwen"]
+        assert result["Value"].tolist() == [100, 200]  # Unchanged
+        assert df["Geslacht"].tolist() == ["1100", "1200"]  # Input left intact
 
     @pytest.mark.asyncio
-    async def test_skips_perioden_by_default(self):
+    async def test_skips_perioden_by_default(self, translator, monkeypatch):
         """Perioden should not be translated (needed for filtering)."""
-        translator = DimensionTranslator()
-
         df = pd.DataFrame({
             "Perioden": ["2023JJ00", "2024JJ00"],
         })
+        monkeypatch.setattr(translator, "get_available_dimensions", AsyncMock(return_value=["Perioden"]))
 
-        with patch.object(translator, 'get_available_dimensions', new_callable=AsyncMock) as mock:
-            mock.return_value = ["Perioden"]
-
-            result = await translator.translate_dataframe(df, "test")
+        result = await translator.translate_dataframe(df, "test")
 
-            assert result["Perioden"].tolist() == ["2023JJ00", "2024JJ00"]
+        assert result["Perioden"].tolist() == ["2023JJ00", "2024JJ00"]
 
     @pytest.mark.asyncio
-    async def test_handles_missing_values(self):
+    async def test_handles_missing_values(self, translator, monkeypatch):
         """Should preserve NaN/None values."""
-        translator = DimensionTranslator()
-
         df = pd.DataFrame({
             "Geslacht": ["1100", None, "1200"],
         })
+        monkeypatch.setattr(translator._cache, "get_mapping", AsyncMock(return_value={"1100": "Mannen", "1200": "Vrouwen"}))
+        monkeypatch.setattr(translator, "get_available_dimensions", AsyncMock(return_value=["Geslacht"]))
 
-        with patch.object(translator._cache, 'get_mapping', new_callable=AsyncMock) as cache_mock:
-            cache_mock.return_value = {"1100": "Mannen", "1200": "Vrouwen"}
-
-            with patch.object(translator, 'get_available_dimensions', new_callable=AsyncMock) as dims_mock:
-                dims_mock.return_value = ["Geslacht"]
-
-                result = await translator.translate_dataframe(df, "test")
+        result = await translator.translate_dataframe(df, "test")
 
-                assert result["Geslacht"].tolist()[0] == "Mannen"
-                assert pd.isna(result["Geslacht"].tolist()[1])
-                assert result["Geslacht"].tolist()[2] == "Vrouwen"
+        assert result["Geslacht"].tolist()[0] == "Mannen"
+        assert pd.isna(result["Geslacht"].tolist()[1])
+        assert result["Geslacht"].tolist()[2] == "Vrouwen"
 
     @pytest.mark.asyncio
-    async def test_handles_empty_dataframe(self):
+    async def test_handles_empty_dataframe(self, translator):
         """Should handle empty DataFrame without error."""
-        translator = DimensionTranslator()
-
         df = pd.DataFrame()
 
         result = await translator.translate_dataframe(df, "test")
@@ -158,42 +248,104 @@ class TestDimensionTranslator:
         assert result.empty
 
     @pytest.mark.asyncio
-    async def test_preserves_unknown_values(self):
+    async def test_preserves_unknown_values(self, translator, monkeypatch):
         """Values not in mapping should remain unchanged."""
-        translator = DimensionTranslator()
-
         df = pd.DataFrame({
             "Geslacht": ["1100", "9999"],  # 9999 not in mapping
         })
+        # No mapping for 9999
+        monkeypatch.setattr(translator._cache, "get_mapping", AsyncMock(return_value={"1100": "Mannen"}))
+        monkeypatch.setattr(translator, "get_available_dimensions", AsyncMock(return_value=["Geslacht"]))
 
-        with patch.object(translator._cache, 'get_mapping', new_callable=AsyncMock) as cache_mock:
-            cache_mock.return_value = {"1100": "Mannen"}  # No mapping for 9999
-
-            with patch.object(translator, 'get_available_dimensions', new_callable=AsyncMock) as dims_mock:
-                dims_mock.return_value = ["Geslacht"]
-
-                result = await translator.translate_dataframe(df, "test")
+        result = await translator.translate_dataframe(df, "test")
 
-                assert result["Geslacht"].tolist()[0] == "Mannen"
-                assert result["Geslacht"].tolist()[1] == "9999"  # Unchanged
+        assert result["Geslacht"].tolist()[0] == "Mannen"
+        assert result["Geslacht"].tolist()[1] == "9999"  # Unchanged
 
     @pytest.mark.asyncio
-    async def test_translate_specific_columns_only(self):
+    async def test_translate_specific_columns_only(self, translator, monkeypatch):
         """Should only translate specified columns when provided."""
-        translator = DimensionTranslator()
-
         df = pd.DataFrame({
             "Geslacht": ["1100"],
             "RegioS": ["GM0363"],
         })
+        monkeypatch.setattr(translator._cache, "get_mapping", AsyncMock(return_value={"1100": "Mannen", "GM0363": "Amsterdam"}))
 
-        with patch.object(translator._cache, 'get_mapping', new_callable=AsyncMock) as cache_mock:
-            cache_mock.return_value = {"1100": "Mannen", "GM0363": "Amsterdam"}
+        # Only translate Geslacht, not RegioS
+        result = await translator.translate_dataframe(
+            df, "test", dimension_columns=["Geslacht"]
+        )
 
-            # Only translate Geslacht, not RegioS
-            result = await translator.translate_dataframe(
-                df, "test", dimension_columns=["Geslacht"]
-            )
+        assert result["Geslacht"].tolist() == ["Mannen"]
+        assert result["RegioS"].tolist() == ["GM0363"]  # Not translated
+
+    @pytest.mark.asyncio
+    async def test_no_dimension_columns_returns_input(self, translator, monkeypatch):
+        """Should skip mapping fetches and copies when no column is a dimension."""
+        df = pd.DataFrame({"Perioden": ["2023JJ00"], "Value": [100]})
+        cache_mock = AsyncMock()
+        monkeypatch.setattr(translator._cache, "get_mapping", cache_mock)
+        monkeypatch.setattr(translator, "get_available_dimensions", AsyncMock(return_value=["Perioden"]))
+
+        result = await translator.translate_dataframe(df, "test")
+
+        assert result is df
+        cache_mock.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_mappings_aligns_columns(self, translator, monkeypatch):
+        """Each mapping should be keyed by the column it was fetched for."""
+        async def fake_mapping(dataset_id, dimension_name):
+            return {"Geslacht": {"1100": "Mannen"}, "RegioS": {"GM0363": "Amsterdam"}}[dimension_name]
+
+        monkeypatch.setattr(translator._cache, "get_mapping", fake_mapping)
+
+        mappings = await translator.get_mappings("test", ["Geslacht", "RegioS"])
 
-            assert result["Geslacht"].tolist() == ["Mannen"]
-            assert result["RegioS"].tolist() == ["GM0363"]  # Not translated
+        assert mappings == {"Geslacht": {"1100": "Mannen"}, "RegioS": {"GM0363": "Amsterdam"}}
+
+    def test_iter_translated_rows(self):
+        """Should translate dimension values row by row, keeping unknown and missing values."""
+        records = [
+            {"Geslacht": "1100   ", "Value": 100},
+            {"Geslacht": "9999", "Value": 200},
+            {"Geslacht": None, "Value": 300},
+        ]
+
+        rows = list(DimensionTranslator.iter_translated_rows(records, {"Geslacht": {"1100": "Mannen"}}))
+
+        assert [r["Geslacht"] for r in rows] == ["Mannen", "9999", None]
+        assert [r["Value"] for r in rows] == [100, 200, 300]
+
+    def test_translate_series(self):
+        """Should translate a column like iter_translated_rows, keeping its index."""
+        series = pd.Series(["1100   ", "9999", None, "1100"], index=[10, 11, 12, 13])
+
+        result = DimensionTranslator.translate_series(series, {"1100": "Mannen"})
+
+        assert result.tolist()[:2] == ["Mannen", "9999"]
+        assert pd.isna(result[12])
+        assert result[13] == "Mannen"
+        assert list(result.index) == [10, 11, 12, 13]
+
+    def test_translate_series_without_matches(self):
+        """Should return the column unchanged when no value has a translation."""
+        series = pd.Series([1, 2, 3])
+
+        assert DimensionTranslator.translate_series(series, {"1100": "Mannen"}) is series
+
+    @pytest.mark.asyncio
+    async def test_translate_records(self, translator, monkeypatch):
+        """Should translate dimension values in a list of records, skipping Perioden."""
+        records = [
+            {"Geslacht": "1100", "Perioden": "2023JJ00", "Value": 100},
+            {"Geslacht": "1200", "Perioden": "2024JJ00", "Value": 200},
+        ]
+        monkeypatch.setattr(translator._cache, "get_mapping", AsyncMock(return_value={"1100": "Mannen", "1200": "Vrouwen"}))
+        monkeypatch.setattr(translator, "get_available_dimensions", AsyncMock(return_value=["Geslacht", "Perioden"]))
+
+        result = await translator.translate_records(records, "test")
+
+        assert [r["Geslacht"] for r in result] == ["Mannen", "Vrouwen"]
+        assert [r["Perioden"] for r in result] == ["2023JJ00", "2024JJ00"]
+        assert [r["Value"] for r in result] == [100, 200]
@@ -3,11 +3,6 @@ Tests for input validation and security functions.
 """
 from nl_opendata_mcp import server
 import pytest
-import sys
-import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from nl_opendata_mcp.utils import (
     validate_dataset_id,
@@ -99,6 +94,16 @@ class TestODataFilterSanitization:
         with pytest.raises(ValidationError):
             sanitize_odata_filter("substringof('test', Field")
 
+    def test_closing_paren_first_raises(self):
+        """Test that a closing paren before its opening one raises error despite equal counts."""
+        with pytest.raises(ValidationError):
+            sanitize_odata_filter("Field eq 'a') or (Field eq 'b'")
+
+    def test_nested_parens_allowed(self):
+        """Test that nested, balanced parentheses pass."""
+        filter_str = "(substringof('a', tolower(Field)) or (Field eq 'b')) and Year eq 2023"
+        assert sanitize_odata_filter(filter_str) == filter_str
+
     def test_unbalanced_quotes_raise(self):
         """Test that unbalanced quotes raise error."""
         with pytest.raises(ValidationError):
@@ -143,6 +148,34 @@ class TestColumnNameSanitization:
         with pytest.raises(ValidationError):
             sanitize_select_columns(["column; DROP TABLE"])
 
+    def test_comma_inside_name_raises(self):
+        """Test that a name cannot smuggle a second column through a comma."""
+        with pytest.raises(ValidationError):
+            sanitize_select_columns(["Perioden,Extra"])
+
+    def test_length_limit(self):
+        """Test the 128 character limit applies to each column in the list."""
+        assert sanitize_select_columns(["a" * 128, "b"]) == ["a" * 128, "b"]
+        with pytest.raises(ValidationError, match="too long"):
+            sanitize_select_columns(["b", "a" * 129])
+
+    def test_error_names_invalid_column(self):
+        """Test the error identifies the offending column in a longer list."""
+        with pytest.raises(ValidationError, match="'Bad-Name'"):
+            sanitize_select_columns(["Perioden", "Bad-Name", "Geslacht"])
+
+    def test_repeated_call_returns_fresh_list(self):
+        """Test that memoized results are not shared between callers."""
+        first = sanitize_select_columns(["Column1"])
+        first.append("Mutated")
+        assert sanitize_select_columns(["Column1"]) == ["Column1"]
+
+    def test_invalid_input_raises_on_every_call(self):
+        """Test that validation failures are not cached as results."""
+        for _ in range(2):
+            with pytest.raises(ValidationError):
+                sanitize_select_columns(["bad column"])
+
 
 class TestPathTraversalProtection:
     """Tests for path traversal protection."""
@@ -181,3 +214,14 @@ class TestPathTraversalProtection:
         """Test that null bytes are blocked."""
         with pytest.raises(ValidationError):
             safe_join_path("/base/dir", "file\x00.csv")
+
+    def test_relative_base_follows_cwd(self, tmp_path, monkeypatch):
+        """Test that a relative base is resolved against the current directory on each call."""
+        first, second = tmp_path / "a", tmp_path / "b"
+        first.mkdir()
+        second.mkdir()
+
+        monkeypatch.chdir(first)
+        assert safe_join_path("downloads", "file.csv") == str(first / "downloads" / "file.csv")
+        monkeypatch.chdir(second)
+        assert safe_join_path("downloads", "file.csv") == str(second / "downloads" / "file.csv")